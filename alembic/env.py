@@ -48,7 +48,7 @@ def run_migrations_offline() -> None:
     script output.
 
     """
-    url = settings.PG_URI
+    url = str(settings.PG_URI)
     context.configure(
         url=url,
         target_metadata=target_metadata,
@@ -74,7 +74,7 @@ async def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
-    connectable = create_async_engine(settings.PG_URI)
+    connectable = create_async_engine(str(settings.PG_URI))
 
     async with connectable.connect() as connection:
         await connection.run_sync(do_run_migrations)
@@ -0,0 +1,111 @@
+"""Post title and dates as typed columns
+
+Revision ID: 2f6d9a41c3e8
+Revises: 8c1e4f7a2b90
+Create Date: 2026-10-17 19:02:47.118305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2f6d9a41c3e8'
+down_revision = '8c1e4f7a2b90'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+# Dates were stored by gen_post_date() as UTC 'YYYY-MM-DD HH24:MI:SS' strings.
+BACKFILL = sa.text(
+    """
+    WITH batch AS (
+        SELECT id FROM post
+        WHERE created IS NULL
+        ORDER BY id
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE post SET
+        title = coalesce(post.post_json ->> 'title', ''),
+        created = coalesce(
+            (post.post_json ->> 'created')::timestamp AT TIME ZONE 'UTC',
+            now()
+        ),
+        modified = (post.post_json ->> 'modified')::timestamp AT TIME ZONE 'UTC',
+        post_json = post.post_json - 'title' - 'created' - 'modified'
+    FROM batch
+    WHERE post.id = batch.id
+    """
+)
+
+RESTORE = sa.text(
+    """
+    WITH batch AS (
+        SELECT id FROM post
+        WHERE NOT post_json ? 'created'
+        ORDER BY id
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE post SET
+        post_json = post.post_json || jsonb_build_object(
+            'title', post.title,
+            'created', to_char(
+                post.created AT TIME ZONE 'UTC', 'YYYY-MM-DD HH24:MI:SS'
+            ),
+            'modified', to_char(
+                post.modified AT TIME ZONE 'UTC', 'YYYY-MM-DD HH24:MI:SS'
+            )
+        )
+    FROM batch
+    WHERE post.id = batch.id
+    """
+)
+
+
+def run_batched(stmt) -> None:
+    # Each batch commits on its own, so row locks are short-lived
+    # and the backfill can be resumed if interrupted.
+    conn = op.get_bind()
+    with op.get_context().autocommit_block():
+        while conn.execute(stmt, {"batch_size": BATCH_SIZE}).rowcount:
+            pass
+
+
+def upgrade() -> None:
+    op.add_column('post', sa.Column('title', sa.Text(), nullable=True))
+    op.add_column('post', sa.Column('created', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('post', sa.Column('modified', sa.DateTime(timezone=True), nullable=True))
+
+    run_batched(BACKFILL)
+
+    op.alter_column('post', 'title', nullable=False)
+    op.alter_column('post', 'created', nullable=False)
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_post_created_id',
+            'post',
+            ['created', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_post_created_id',
+            table_name='post',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+    run_batched(RESTORE)
+
+    op.drop_column('post', 'modified')
+    op.drop_column('post', 'created')
+    op.drop_column('post', 'title')
@@ -0,0 +1,63 @@
+"""Post rendered response JSON
+
+Revision ID: 3c7f1a9e6b25
+Revises: 9a4d2c6e8f13
+Create Date: 2026-10-17 23:41:08.517302
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c7f1a9e6b25'
+down_revision = '9a4d2c6e8f13'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+# Same JSON as render_post() in app/crud/crud_post.py makes.
+BACKFILL = sa.text(
+    """
+    WITH batch AS (
+        SELECT id FROM post
+        WHERE rendered IS NULL
+        ORDER BY id
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE post SET rendered = json_build_object(
+        'post_id', post.post_id,
+        'writer', account.fullname,
+        'title', post.title,
+        'description', post.description,
+        'content', post.content,
+        'tags', post.post_json -> 'tags',
+        'created', to_char(
+            timezone('UTC', post.created), 'YYYY-MM-DD"T"HH24:MI:SS'
+        ),
+        'modified', to_char(
+            timezone('UTC', post.modified), 'YYYY-MM-DD"T"HH24:MI:SS'
+        ),
+        'estimated', CAST(post.post_json ->> 'estimated' AS INTEGER)
+    )::text
+    FROM batch, account
+    WHERE post.id = batch.id AND account.id = post.account_id
+    """
+)
+
+
+def upgrade() -> None:
+    op.add_column('post', sa.Column('rendered', sa.Text(), nullable=True))
+
+    conn = op.get_bind()
+    with op.get_context().autocommit_block():
+        while conn.execute(BACKFILL, {"batch_size": BATCH_SIZE}).rowcount:
+            pass
+
+    op.alter_column('post', 'rendered', nullable=False)
+
+
+def downgrade() -> None:
+    op.drop_column('post', 'rendered')
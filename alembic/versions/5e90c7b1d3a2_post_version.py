@@ -0,0 +1,48 @@
+"""Post version for ETag
+
+Revision ID: 5e90c7b1d3a2
+Revises: d41c8b2e9a67
+Create Date: 2026-10-17 20:18:54.210377
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e90c7b1d3a2'
+down_revision = 'd41c8b2e9a67'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+BACKFILL = sa.text(
+    """
+    WITH batch AS (
+        SELECT id FROM post
+        WHERE version IS NULL
+        ORDER BY id
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE post SET version = md5(post.id::text || random()::text)
+    FROM batch
+    WHERE post.id = batch.id
+    """
+)
+
+
+def upgrade() -> None:
+    op.add_column('post', sa.Column('version', sa.String(length=32), nullable=True))
+
+    conn = op.get_bind()
+    with op.get_context().autocommit_block():
+        while conn.execute(BACKFILL, {"batch_size": BATCH_SIZE}).rowcount:
+            pass
+
+    op.alter_column('post', 'version', nullable=False)
+
+
+def downgrade() -> None:
+    op.drop_column('post', 'version')
@@ -0,0 +1,40 @@
+"""Post tags GIN index
+
+Revision ID: 8c1e4f7a2b90
+Revises: 415f17536d0f
+Create Date: 2026-10-17 18:40:12.310442
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c1e4f7a2b90'
+down_revision = '415f17536d0f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY can't run inside a transaction block.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_post_tags',
+            'post',
+            [sa.text("(post_json -> 'tags') jsonb_path_ops")],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_post_tags',
+            table_name='post',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,35 @@
+"""Account token epoch
+
+Revision ID: 9a4d2c6e8f13
+Revises: 5e90c7b1d3a2
+Create Date: 2026-10-17 21:02:37.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a4d2c6e8f13'
+down_revision = '5e90c7b1d3a2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(sa.schema.CreateSequence(sa.Sequence('account_token_epoch_seq')))
+    # Account table is small, volatile default fills existing rows in place.
+    op.add_column(
+        'account',
+        sa.Column(
+            'token_epoch',
+            sa.BigInteger(),
+            server_default=sa.text("nextval('account_token_epoch_seq')"),
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('account', 'token_epoch')
+    op.execute(sa.schema.DropSequence(sa.Sequence('account_token_epoch_seq')))
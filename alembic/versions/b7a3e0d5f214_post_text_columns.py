@@ -0,0 +1,79 @@
+"""Post description and content as separate columns
+
+Revision ID: b7a3e0d5f214
+Revises: 2f6d9a41c3e8
+Create Date: 2026-10-17 19:31:05.442916
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7a3e0d5f214'
+down_revision = '2f6d9a41c3e8'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+
+BACKFILL = sa.text(
+    """
+    WITH batch AS (
+        SELECT id FROM post
+        WHERE content IS NULL
+        ORDER BY id
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE post SET
+        description = coalesce(post.post_json ->> 'description', ''),
+        content = coalesce(post.post_json ->> 'content', ''),
+        post_json = post.post_json - 'description' - 'content'
+    FROM batch
+    WHERE post.id = batch.id
+    """
+)
+
+RESTORE = sa.text(
+    """
+    WITH batch AS (
+        SELECT id FROM post
+        WHERE NOT post_json ? 'content'
+        ORDER BY id
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE post SET
+        post_json = post.post_json || jsonb_build_object(
+            'description', post.description,
+            'content', post.content
+        )
+    FROM batch
+    WHERE post.id = batch.id
+    """
+)
+
+
+def run_batched(stmt) -> None:
+    conn = op.get_bind()
+    with op.get_context().autocommit_block():
+        while conn.execute(stmt, {"batch_size": BATCH_SIZE}).rowcount:
+            pass
+
+
+def upgrade() -> None:
+    op.add_column('post', sa.Column('description', sa.Text(), nullable=True))
+    op.add_column('post', sa.Column('content', sa.Text(), nullable=True))
+
+    run_batched(BACKFILL)
+
+    op.alter_column('post', 'description', nullable=False)
+    op.alter_column('post', 'content', nullable=False)
+
+
+def downgrade() -> None:
+    run_batched(RESTORE)
+
+    op.drop_column('post', 'content')
+    op.drop_column('post', 'description')
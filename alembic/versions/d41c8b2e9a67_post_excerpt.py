@@ -0,0 +1,49 @@
+"""Post listing excerpt column
+
+Revision ID: d41c8b2e9a67
+Revises: b7a3e0d5f214
+Create Date: 2026-10-17 19:52:31.905124
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41c8b2e9a67'
+down_revision = 'b7a3e0d5f214'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+# Same length as EXCERPT_LENGTH in app/crud/crud_post.py
+BACKFILL = sa.text(
+    """
+    WITH batch AS (
+        SELECT id FROM post
+        WHERE excerpt IS NULL
+        ORDER BY id
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE post SET excerpt = left(post.description, 250)
+    FROM batch
+    WHERE post.id = batch.id
+    """
+)
+
+
+def upgrade() -> None:
+    op.add_column('post', sa.Column('excerpt', sa.Text(), nullable=True))
+
+    conn = op.get_bind()
+    with op.get_context().autocommit_block():
+        while conn.execute(BACKFILL, {"batch_size": BATCH_SIZE}).rowcount:
+            pass
+
+    op.alter_column('post', 'excerpt', nullable=False)
+
+
+def downgrade() -> None:
+    op.drop_column('post', 'excerpt')
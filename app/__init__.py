@@ -1,10 +1,28 @@
 __version__ = "0.0.1"
 
+from functools import partial
+
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 
 from app.api import routes
+from app.core.cache import cache, principal_cache
 from app.core.config import settings
+from app.core.metrics import (
+    MetricsMiddleware,
+    instrument_engine,
+    metrics,
+    metrics_endpoint,
+)
+from app.core.request_context import RequestContextMiddleware
+from app.core.security import hashing_pool
+from app.core.server_timing import (
+    ServerTimingMiddleware,
+    TimedJSONResponse,
+    time_queries,
+)
+from app.core.slow_query import slow_query_log
+from app.db.session import engine, pool_status, replica_router
 
 
 def create_app() -> FastAPI:
@@ -23,6 +41,7 @@ def create_app() -> FastAPI:
         openapi_url=settings.OPENAPI_URI,
         docs_url=settings.DOC_URL,
         redoc_url=settings.REDOC_URL,
+        default_response_class=TimedJSONResponse,
     )
 
     app.add_middleware(
@@ -35,4 +54,34 @@ def create_app() -> FastAPI:
 
     app.include_router(routes.api_router, prefix=settings.API_URL)
 
+    db_engines = [engine, *(replica.engine for replica in replica_router.replicas)]
+
+    if settings.SLOW_QUERY_LOG_ENABLED:
+        for db_engine in db_engines:
+            slow_query_log.instrument(db_engine)
+        # Slow statements are logged with the route which ran them.
+        app.add_middleware(RequestContextMiddleware)
+
+    if settings.SERVER_TIMING_ENABLED:
+        for db_engine in db_engines:
+            time_queries(db_engine)
+        app.add_middleware(
+            ServerTimingMiddleware,
+            sample=settings.SERVER_TIMING_SAMPLE,
+        )
+
+    if settings.METRICS_ENABLED:
+        for db_engine in db_engines:
+            instrument_engine(db_engine)
+        metrics.collect("cache", cache.info)
+        metrics.collect("principal_cache", principal_cache.info)
+        metrics.collect("db_pool", pool_status, pool="primary")
+        for number, replica in enumerate(replica_router.replicas):
+            replica_pool = partial(pool_status, replica.engine)
+            metrics.collect("db_pool", replica_pool, pool=f"replica{number}")
+        metrics.collect("password_hash", hashing_pool.info)
+        # Added last, so it is outermost and sees CORS handling as well.
+        app.add_middleware(MetricsMiddleware)
+        app.add_route(settings.METRICS_URL, metrics_endpoint, include_in_schema=False)
+
     return app
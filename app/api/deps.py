@@ -8,6 +8,8 @@ from app import crud, schemas
 from app.core import exceptions
 from app.core.config import settings
 from app.core.security import verify_access_token
+from app.core.server_timing import timed
+from app.core.token_epochs import token_epochs
 from app.db.session import get_db_session
 
 reusable_oauth2 = OAuth2PasswordBearer(
@@ -18,20 +20,33 @@ reusable_oauth2 = OAuth2PasswordBearer(
 async def verify_user_token(
     db: AsyncSession = Depends(get_db_session),
     token: str = Depends(reusable_oauth2),
-) -> schemas.UserFromDB:
+) -> schemas.TokenPayload:
+    with timed("auth"):
+        return await check_token(db, token)
+
+
+async def check_token(db: AsyncSession, token: str) -> schemas.TokenPayload:
     try:
         payload = verify_access_token(token)
         token_data = schemas.TokenPayload(**payload)
-        user = await crud.user.get_user(db, email=token_data.sub)
-        assert user
 
     except ExpiredSignatureError:
         raise exceptions.TokenExpired
 
-    except (JWTError, ValidationError, AssertionError):
+    except (JWTError, ValidationError):
         raise exceptions.InvalidCredentials
 
-    return user
+    # Epoch map is in memory, DB is queried only when it is due to refresh.
+    if not await token_epochs.is_current(
+        db,
+        account_id=token_data.uid,
+        epoch=token_data.epoch,
+    ):
+        raise exceptions.TokenRevoked
+
+    # Don't hold a connection from epoch refresh while the endpoint runs.
+    await db.close()
+    return token_data
 
 
 class AuthCheck:
@@ -46,14 +61,31 @@ class AuthCheck:
 
     def __call__(
         self,
-        current_user: schemas.UserFromDB = Depends(verify_user_token),
-    ) -> schemas.UserFromDB:
+        token_data: schemas.TokenPayload = Depends(verify_user_token),
+    ) -> schemas.TokenPayload:
+        self.check(token_data)
+        return token_data
+
+    def check(self, token_data: schemas.TokenPayload) -> None:
         if self.isadmin:
-            if current_user.role_name != "admin":
+            if token_data.role != "admin":
                 raise exceptions.PrivelegesError
 
         if self.isdisabled:
-            if current_user.disabled:
+            if token_data.disabled:
                 raise exceptions.DisabledUser
 
-        return current_user
+
+class CurrentUser(AuthCheck):
+    """Same checks as `AuthCheck`, but returns the whole account."""
+
+    async def __call__(  # type: ignore[override]
+        self,
+        db: AsyncSession = Depends(get_db_session),
+        token_data: schemas.TokenPayload = Depends(verify_user_token),
+    ) -> schemas.UserFromDB:
+        self.check(token_data)
+        user = await crud.user.get_principal(db, email=token_data.sub)
+        if not user:
+            raise exceptions.InvalidCredentials
+        return user
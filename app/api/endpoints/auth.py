@@ -5,10 +5,11 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, schemas
+from app.api.route import SessionReleaseRoute
 from app.core import exceptions, security
 from app.db.session import get_db_session as db_session
 
-router = APIRouter()
+router = APIRouter(route_class=SessionReleaseRoute)
 
 
 @router.post("/login", response_model=schemas.TokenResponse)
@@ -26,7 +27,13 @@ async def login_access_token(
     elif user.disabled:
         raise exceptions.DisabledUser
 
-    token = security.create_access_token(user.email)
+    token = security.create_access_token(
+        user.email,
+        uid=user.id,
+        role=user.role_name,
+        disabled=user.disabled,
+        epoch=user.token_epoch,
+    )
     result = {
         "access_token": token,
         "token_type": "bearer",
@@ -1,40 +1,117 @@
 import math
-from typing import Any, Dict, List, Literal, Optional
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Union
 
-from fastapi import APIRouter, Depends, Query, Response, status
+import orjson
+from fastapi import APIRouter, Depends, Header, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, schemas
 from app.api import deps
+from app.api.responses import model_response
+from app.api.route import SessionReleaseRoute
 from app.core import exceptions
+from app.core.config import settings
+from app.core.etag import etag_matches, make_etag, make_weak_etag
 from app.db.session import get_db_session as db_session
+from app.db.session import get_read_db_session as read_db_session
 
-router = APIRouter()
+router = APIRouter(route_class=SessionReleaseRoute)
 
 
 @router.get("/tags", response_model=schemas.TagsResponse)
-async def get_tags(db: AsyncSession = Depends(db_session)) -> Any:
+async def get_tags(db: AsyncSession = Depends(read_db_session)) -> Any:
     all_tags = await crud.tag.get_all_tags(db)
-    return all_tags
+    return model_response(schemas.TagsResponse, all_tags)
 
 
-@router.get("/", response_model=schemas.PageResponse)
-async def get_pagination(
+def parse_import_line(line: bytes) -> schemas.ImportPostRequest:
+    try:
+        return schemas.ImportPostRequest.model_validate_json(line)
+    except ValidationError:
+        raise exceptions.ImportBadRequest
+
+
+async def read_ndjson(request: Request) -> AsyncIterator[schemas.ImportPostRequest]:
+    # Body is parsed as it arrives, only one batch of posts is held at a time.
+    buffer = b""
+    async for chunk in request.stream():
+        *lines, buffer = (buffer + chunk).split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield parse_import_line(line)
+    if buffer.strip():
+        yield parse_import_line(buffer)
+
+
+@router.post("/import", response_model=schemas.ImportPostsResponse)
+async def import_posts(
+    request: Request,
     db: AsyncSession = Depends(db_session),
     *,
-    page: int = Query(default=1, ge=1),
-    page_size: int = Query(default=3, ge=1, le=100),
-    sort: Literal["created"] = "created",
-    order: Optional[Literal["asc", "desc"]] = None,
-    tags: Optional[str] = None,
+    current_user: schemas.TokenPayload = Depends(
+        deps.AuthCheck(isadmin=True, isdisabled=True),
+    ),
 ) -> Any:
-    result: Dict = {}
+    """
+    Loads posts from NDJSON body, one post per line, in one transaction.
+    Posts with post_id which already exists are skipped.
+    """
+    imported, skipped = await crud.post.import_posts(
+        db,
+        user_id=current_user.uid,
+        posts=read_ndjson(request),
+        batch_size=settings.POST_IMPORT_BATCH_SIZE,
+    )
+    return {"imported": imported, "skipped": skipped}
 
-    tags_array: List = []
-    if tags:
-        tags_array = tags.split(",")
 
-    total_records = await crud.post.count_post_with_filters(db, tags=tags_array)
+@router.get("/export", response_class=StreamingResponse)
+async def export_posts(
+    db: AsyncSession = Depends(db_session),
+    *,
+    current_user: schemas.TokenPayload = Depends(
+        deps.AuthCheck(isadmin=True, isdisabled=True),
+    ),
+) -> Any:
+    """All posts as NDJSON, in the format import takes."""
+
+    async def lines() -> AsyncIterator[bytes]:
+        # Dependency teardown closes the session before the body is sent.
+        # Closed session still works: the stream checks out a connection of
+        # its own, so it has to close the session once done.
+        try:
+            posts = crud.post.export_posts(
+                db,
+                batch_size=settings.POST_EXPORT_BATCH_SIZE,
+            )
+            async for post in posts:
+                yield orjson.dumps(post) + b"\n"
+        finally:
+            await db.close()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+async def page_number_pagination(
+    db: AsyncSession,
+    *,
+    page: int,
+    page_size: int,
+    sort: str,
+    order: Optional[str],
+    tags_array: List[str],
+) -> Response:
+    # Page comes rendered by DB, response model validation is skipped.
+    total_records, content = await crud.post.get_page_json(
+        db,
+        page=page,
+        page_size=page_size,
+        sort=sort,
+        order=order,
+        tags=tags_array,
+    )
     if not total_records:
         raise exceptions.NotFound
 
@@ -42,40 +119,169 @@ async def get_pagination(
     if page > total_pages:
         raise exceptions.PageBadRequest
 
-    # Calculate offset based on incoming page number.
-    offset = (page - 1) * page_size
-    all_posts = await crud.post.get_all_posts(
+    return Response(content, media_type="application/json")
+
+
+def decode_cursor(
+    cursor: str,
+    *,
+    order: Optional[str],
+    tags_array: Optional[List[str]],
+) -> schemas.PostCursor:
+    """
+    Cursor carries order and tags of its listing, so they may be omitted.
+    Given ones must be the same, the cursor position is wrong for another
+    listing.
+    """
+    try:
+        position = schemas.PostCursor.decode(cursor)
+    except (ValueError, ValidationError):
+        raise exceptions.CursorBadRequest
+
+    if order is not None and order != position.order:
+        raise exceptions.CursorBadRequest
+    if tags_array is not None and sorted(tags_array) != position.tags:
+        raise exceptions.CursorBadRequest
+    return position
+
+
+async def cursor_pagination(
+    db: AsyncSession,
+    *,
+    position: Optional[schemas.PostCursor],
+    page_size: int,
+    order: Optional[str],
+    tags_array: List[str],
+) -> Response:
+    all_posts, has_more = await crud.post.get_posts_by_cursor(
         db,
-        offset=offset,
         limit=page_size,
-        sort=sort,
         order=order,
         tags=tags_array,
+        cursor=position,
     )
+    if not all_posts:
+        raise exceptions.NotFound
+
+    backward = bool(position and position.backward)
+    first, last = all_posts[0], all_posts[-1]
+
+    listing: Dict[str, Any] = {"order": order or "asc", "tags": sorted(tags_array)}
+
+    next_cursor = None
+    if has_more or backward:
+        next_cursor = schemas.PostCursor(
+            created=last.created,
+            id=last.id,
+            **listing,
+        ).encode()
+
+    prev_cursor = None
+    if (has_more and backward) or (position and not backward):
+        prev_cursor = schemas.PostCursor(
+            created=first.created,
+            id=first.id,
+            backward=True,
+            **listing,
+        ).encode()
+
+    result = schemas.CursorPageResponse.model_construct(
+        page_size=page_size,
+        filter_tags=tags_array,
+        next_cursor=next_cursor,
+        prev_cursor=prev_cursor,
+        data=all_posts,
+    )
+    return model_response(schemas.CursorPageResponse, result)
+
+
+@router.get(
+    "/",
+    response_model=Union[schemas.PageResponse, schemas.CursorPageResponse],
+)
+async def get_pagination(
+    db: AsyncSession = Depends(read_db_session),
+    *,
+    if_none_match: Optional[str] = Header(default=None),
+    page: int = Query(default=1, ge=1),
+    page_size: int = Query(default=3, ge=1, le=100),
+    sort: Literal["created"] = "created",
+    order: Optional[Literal["asc", "desc"]] = None,
+    tags: Optional[str] = None,
+    mode: Literal["page", "cursor"] = "page",
+    cursor: Optional[str] = None,
+) -> Any:
+    tags_array: List = []
+    if tags:
+        tags_array = tags.split(",")
+
+    position: Optional[schemas.PostCursor] = None
+    if cursor:
+        position = decode_cursor(
+            cursor,
+            order=order,
+            tags_array=tags_array if tags is not None else None,
+        )
+        order, tags_array = position.order, position.tags
 
-    result = {
-        "current_page": page,
-        "total_pages": total_pages,
-        "page_size": page_size,
-        "total_records": total_records,
-        "filter_tags": tags_array,
-        "data": all_posts,
-    }
-    return result
+    # Keyset mode is always sorted by (created, id) and ignores page number.
+    if mode == "cursor" or cursor:
+        page_response = await cursor_pagination(
+            db,
+            position=position,
+            page_size=page_size,
+            order=order,
+            tags_array=tags_array,
+        )
+    else:
+        page_response = await page_number_pagination(
+            db,
+            page=page,
+            page_size=page_size,
+            sort=sort,
+            order=order,
+            tags_array=tags_array,
+        )
+    # Page is a single statement, cached or not. Its body is the validator:
+    # a separate query for a listing version would double the round-trips.
+    etag = make_weak_etag(page_response.body)
+    if etag_matches(if_none_match, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag},
+        )
+    # Headers of `response` aren't applied to a returned Response.
+    page_response.headers["ETag"] = etag
+    return page_response
 
 
 @router.get("/{post_id}", response_model=schemas.PostResponse)
 async def get_specific_post(
-    db: AsyncSession = Depends(db_session),
+    db: AsyncSession = Depends(read_db_session),
     *,
     post_id: str,
+    if_none_match: Optional[str] = Header(default=None),
 ) -> Any:
-    post = await crud.post.get_post_id(db, post_id=post_id)
+    # Conditional request is answered by version alone, the body isn't loaded.
+    if if_none_match:
+        version = await crud.post.get_post_version(db, post_id=post_id)
+        if version and etag_matches(if_none_match, make_etag(version)):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": make_etag(version)},
+            )
 
+    # Body is stored rendered on write and goes out as is.
+    post = await crud.post.get_rendered_post(db, post_id=post_id)
     if not post:
         raise exceptions.NotFound
 
-    return post
+    content, version = post
+    return Response(
+        content,
+        media_type="application/json",
+        headers={"ETag": make_etag(version)},
+    )
 
 
 @router.delete(
@@ -87,7 +293,7 @@ async def delete_post(
     db: AsyncSession = Depends(db_session),
     *,
     post_id: str,
-    current_user: schemas.UserFromDB = Depends(
+    current_user: schemas.TokenPayload = Depends(
         deps.AuthCheck(isadmin=True, isdisabled=True),
     ),
 ) -> Any:
@@ -99,11 +305,12 @@ async def delete_post(
     response_model=schemas.UpdatePostResponse,
 )
 async def update_post(
+    response: Response,
     db: AsyncSession = Depends(db_session),
     *,
     post_id: str,
     body: schemas.UpdatePostRequest,
-    current_user: schemas.UserFromDB = Depends(
+    current_user: schemas.TokenPayload = Depends(
         deps.AuthCheck(
             isadmin=True,
             isdisabled=True,
@@ -117,11 +324,12 @@ async def update_post(
         post_id=post_id,
         obj_in=update_post,
     )
+    if not result:
+        raise exceptions.NotFound
 
-    if body.tags:
-        await crud.tag.add_tags(db, tags=body.tags)
-
-    return {"post_id": result}
+    post_id, version = result
+    response.headers["ETag"] = make_etag(version)
+    return {"post_id": post_id}
 
 
 @router.post("/", response_model=schemas.CreatePostResponse)
@@ -129,7 +337,7 @@ async def create_post(
     db: AsyncSession = Depends(db_session),
     *,
     body: schemas.CreatePostRequest,
-    current_user: schemas.UserFromDB = Depends(
+    current_user: schemas.TokenPayload = Depends(
         deps.AuthCheck(isadmin=True, isdisabled=True),
     ),
 ) -> Any:
@@ -137,11 +345,8 @@ async def create_post(
 
     result = await crud.post.create_post(
         db,
-        user_id=current_user.id,
+        user_id=current_user.uid,
         obj_in=new_post,
     )
 
-    if body.tags:
-        await crud.tag.add_tags(db, tags=body.tags)
-
     return {"post_id": result}
@@ -6,12 +6,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, schemas
 from app.api import deps
+from app.api.responses import model_response
+from app.api.route import SessionReleaseRoute
 from app.core import exceptions
 from app.core.security import get_password_hash, verify_password
 from app.db.session import get_db_session as db_session
 from app.schemas import spec_types
 
-router = APIRouter()
+router = APIRouter(route_class=SessionReleaseRoute)
 
 
 async def get_user_helper(
@@ -35,12 +37,12 @@ async def get_user_helper(
 @router.get("/", response_model=List[schemas.UserResponse])
 async def get_all_users(
     db: AsyncSession = Depends(db_session),
-    current_user: schemas.UserFromDB = Depends(
+    current_user: schemas.TokenPayload = Depends(
         deps.AuthCheck(isadmin=True, isdisabled=True),
     ),
 ) -> Any:
     all_users = await crud.user.get_all_users(db)
-    return all_users
+    return model_response(List[schemas.UserResponse], all_users)
 
 
 @router.post("/", response_model=schemas.UserResponse)
@@ -48,7 +50,7 @@ async def create_user(
     *,
     db: AsyncSession = Depends(db_session),
     body: schemas.CreateUserRequest,
-    current_user: schemas.UserFromDB = Depends(
+    current_user: schemas.TokenPayload = Depends(
         deps.AuthCheck(isadmin=True, isdisabled=True),
     ),
 ) -> Any:
@@ -63,14 +65,14 @@ async def create_user(
     new_user = schemas.UserToDB(**body.model_dump(), role_id=role_id)
 
     result = await crud.user.create(db, obj_in=new_user)
-    return result
+    return model_response(schemas.UserResponse, result)
 
 
 @router.get("/me", response_model=schemas.UserResponse)
 async def test_token(
-    current_user: schemas.UserFromDB = Depends(deps.AuthCheck()),
+    current_user: schemas.UserFromDB = Depends(deps.CurrentUser()),
 ) -> Any:
-    return current_user
+    return model_response(schemas.UserResponse, current_user)
 
 
 @router.post(
@@ -83,17 +85,17 @@ async def change_me_password(
     db: AsyncSession = Depends(db_session),
     body: schemas.ChangeMePasswordRequest,
     current_user: schemas.UserFromDB = Depends(
-        deps.AuthCheck(isdisabled=True),
+        deps.CurrentUser(isdisabled=True),
     ),
 ) -> Any:
-    check_password = verify_password(
+    check_password = await verify_password(
         body.old_password.get_secret_value(),
         current_user.hashed_password,
     )
     if not check_password:
         raise exceptions.InvalidCredentials
 
-    new_password_hash = get_password_hash(body.new_password.get_secret_value())
+    new_password_hash = await get_password_hash(body.new_password.get_secret_value())
 
     await crud.user.change_password(
         db,
@@ -107,11 +109,12 @@ async def read_user(
     *,
     db: AsyncSession = Depends(db_session),
     some_user: Union[int, EmailStr],
-    current_user: schemas.UserFromDB = Depends(
+    current_user: schemas.TokenPayload = Depends(
         deps.AuthCheck(isadmin=True, isdisabled=True),
     ),
 ) -> Any:
-    return await get_user_helper(db, some_user)
+    user_in_db = await get_user_helper(db, some_user)
+    return model_response(schemas.UserResponse, user_in_db)
 
 
 @router.put("/{some_user}", response_model=schemas.UserResponse)
@@ -120,7 +123,7 @@ async def update_specific_user(
     db: AsyncSession = Depends(db_session),
     some_user: Union[int, EmailStr],
     body: schemas.UpdateUserRequest,
-    current_user: schemas.UserFromDB = Depends(
+    current_user: schemas.TokenPayload = Depends(
         deps.AuthCheck(isadmin=True, isdisabled=True),
     ),
 ) -> Any:
@@ -152,7 +155,7 @@ async def update_specific_user(
         obj_in=updated_user,
     )
 
-    return result
+    return model_response(schemas.UserResponse, result)
 
 
 @router.delete(
@@ -164,7 +167,7 @@ async def delete_specific_user(
     *,
     db: AsyncSession = Depends(db_session),
     some_user: Union[int, EmailStr],
-    current_user: schemas.UserFromDB = Depends(
+    current_user: schemas.TokenPayload = Depends(
         deps.AuthCheck(isadmin=True, isdisabled=True),
     ),
 ) -> Any:
@@ -182,7 +185,7 @@ async def disable_specific_user(
     *,
     body: schemas.DisableUserRequest,
     some_user: Union[int, EmailStr],
-    current_user: schemas.UserFromDB = Depends(
+    current_user: schemas.TokenPayload = Depends(
         deps.AuthCheck(isadmin=True, isdisabled=True),
     ),
 ) -> Any:
@@ -205,12 +208,12 @@ async def change_user_password(
     db: AsyncSession = Depends(db_session),
     body: schemas.ChangeUserPasswordRequest,
     some_user: Union[int, EmailStr],
-    current_user: schemas.UserFromDB = Depends(
+    current_user: schemas.TokenPayload = Depends(
         deps.AuthCheck(isadmin=True, isdisabled=True),
     ),
 ) -> Any:
     user_in_db = await get_user_helper(db, some_user)
-    new_password_hash = get_password_hash(body.new_password.get_secret_value())
+    new_password_hash = await get_password_hash(body.new_password.get_secret_value())
     await crud.user.change_password(
         db,
         id=user_in_db.id,
@@ -0,0 +1,46 @@
+import asyncio
+import functools
+from typing import Any, Callable, Dict
+
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.responses import StreamingResponse
+
+from app.core.server_timing import mark_endpoint_done
+
+
+async def release_sessions(values: Dict[str, Any]) -> None:
+    # Closed session gives its connection back to the pool and still
+    # can be used again, it just checks out a new one then.
+    for value in values.values():
+        if isinstance(value, AsyncSession):
+            await value.close()
+
+
+class SessionReleaseRoute(APIRoute):
+    """
+    Route which closes DB sessions of the endpoint as soon as it returns.
+    Sessions check out a connection lazily on the first query, but keep it
+    until closed. Dependency teardown runs only after the response model is
+    validated and serialized, so without this the connection idles through
+    all of that. Streaming responses keep their sessions open.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        super().__init__(path, endpoint, **kwargs)
+        call = self.dependant.call
+        if not asyncio.iscoroutinefunction(call):
+            return
+
+        @functools.wraps(call)  # type: ignore[arg-type]
+        async def call_and_release(**values: Any) -> Any:
+            result = None
+            try:
+                result = await call(**values)  # type: ignore[misc]
+                return result
+            finally:
+                if not isinstance(result, StreamingResponse):
+                    await release_sessions(values)
+                mark_endpoint_done()
+
+        self.dependant.call = call_and_release
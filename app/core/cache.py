@@ -0,0 +1,217 @@
+import functools
+import pickle
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Iterable,
+    Set,
+    Tuple,
+)
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+MISSING = object()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    size: int
+    expires: float
+    tags: FrozenSet[str]
+
+
+class TTLCache:
+    """
+    In-process LRU cache bounded by estimated size of values in bytes.
+    **Parameters**
+    * `max_bytes`: Total size of stored values, least recently used go first
+    * `ttl`: Default time to live of an entry in seconds
+    * `enabled`: Disabled cache stores nothing and always misses
+    Entries may carry tags, `invalidate()` drops every entry with given tag.
+    Each invalidation also bumps generation of the tag, so a value read
+    before it can be told stale and not stored, see `generation()`.
+    """
+
+    def __init__(self, *, max_bytes: int, ttl: float, enabled: bool = True):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.enabled = enabled
+        self.stats = CacheStats()
+        self.size_bytes = 0
+        self._entries: OrderedDict[Hashable, CacheEntry] = OrderedDict()
+        self._tags: Dict[str, Set[Hashable]] = {}
+        self._generations: Dict[str, int] = {}
+        self._clears = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return MISSING
+
+        if entry.expires <= time.monotonic():
+            self._remove(key)
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return MISSING
+
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return entry.value
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        *,
+        ttl: float | None = None,
+        tags: Iterable[str] = (),
+    ) -> None:
+        if not self.enabled:
+            return
+
+        size = len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+        if size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        entry = CacheEntry(
+            value=value,
+            size=size,
+            expires=expires,
+            tags=frozenset(tags),
+        )
+        self._entries[key] = entry
+        self.size_bytes += size
+        for tag in entry.tags:
+            self._tags.setdefault(tag, set()).add(key)
+
+        while self.size_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.stats.evictions += 1
+
+    def generation(self, tags: Iterable[str]) -> Tuple[int, ...]:
+        """Changes once any of `tags` is invalidated or the cache cleared."""
+        return (self._clears, *(self._generations.get(tag, 0) for tag in tags))
+
+    def invalidate(self, *tags: str) -> None:
+        for tag in tags:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+            for key in self._tags.pop(tag, set()):
+                if key in self._entries:
+                    self._remove(key)
+                    self.stats.invalidations += 1
+
+    def clear(self) -> None:
+        self._clears += 1
+        self._entries.clear()
+        self._tags.clear()
+        self.size_bytes = 0
+
+    def info(self) -> Dict[str, int]:
+        return {
+            **asdict(self.stats),
+            "entries": len(self._entries),
+            "size_bytes": self.size_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self.size_bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+def freeze(value: Any) -> Hashable:
+    """Hashable representation of CRUD call arguments."""
+    if isinstance(value, BaseModel):
+        return value.model_dump_json()
+    if isinstance(value, dict):
+        return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def cached(
+    store: TTLCache,
+    tag: str,
+    *,
+    tags: Callable[..., Iterable[str]] | None = None,
+    ttl: float | None = None,
+) -> Callable:
+    """
+    Read-through caching of async CRUD method `(self, db, **kwargs)`.
+    Key is made from method name and keyword arguments, the session is ignored.
+    `tags` gets the same keyword arguments and returns tags of the entry,
+    by default an entry is tagged with `tag` only.
+    """
+
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable:
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        async def wrapper(self: Any, db: Any, **kwargs: Any) -> Any:
+            if not store.enabled:
+                return await func(self, db, **kwargs)
+
+            key = (name, freeze(kwargs))
+            value = store.get(key)
+            if value is MISSING:
+                entry_tags = tuple(tags(**kwargs) if tags else (tag,))
+                generation = store.generation(entry_tags)
+                value = await func(self, db, **kwargs)
+                # A write invalidated the entry while it was read, the value
+                # may predate the write and is returned, but not stored.
+                if store.generation(entry_tags) == generation:
+                    store.set(key, value, ttl=ttl, tags=entry_tags)
+
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+cache = TTLCache(
+    max_bytes=settings.CACHE_MAX_BYTES,
+    ttl=settings.CACHE_TTL,
+    enabled=settings.CACHE_ENABLED,
+)
+
+principal_cache = TTLCache(
+    max_bytes=settings.PRINCIPAL_CACHE_MAX_BYTES,
+    ttl=settings.PRINCIPAL_CACHE_TTL,
+    enabled=settings.CACHE_ENABLED,
+)
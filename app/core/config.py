@@ -1,7 +1,7 @@
 import os
 import secrets
 from functools import lru_cache
-from typing import Optional, cast
+from typing import Any, Dict, List, Literal, Optional, cast
 
 from pydantic import (
     BaseModel,
@@ -37,6 +37,9 @@ class BaseConfig(BaseSettings):
     JWT_SECRET_KEY: SecretStr = cast(SecretStr, secrets.token_urlsafe(32))
     JWT_ALGORITHM: str = "HS256"
     JWT_REALM: Optional[str] = None
+    # Token revocation made by another worker is seen within these bounds.
+    TOKEN_EPOCH_REFRESH_SECONDS: float = 2
+    TOKEN_EPOCH_RELOAD_SECONDS: float = 60
 
     @field_validator("JWT_REALM", mode="before")
     @classmethod
@@ -74,9 +77,75 @@ class BaseConfig(BaseSettings):
         )
         return pg_dsn
 
+    PG_POOL_SIZE: int = 5
+    PG_POOL_MAX_OVERFLOW: int = 5
+    # Seconds to wait for a free connection before giving up.
+    PG_POOL_TIMEOUT: float = 30
+    # Connections older than this are replaced on checkout, -1 keeps them.
+    PG_POOL_RECYCLE: int = -1
+    PG_POOL_PRE_PING: bool = False
+    # Prepared statements cached per connection, 0 behind pgbouncer.
+    PG_STATEMENT_CACHE_SIZE: int = 100
+
+    # Read replicas for public reads, JSON list in env: '["postgresql+asyncpg://.."]'
+    PG_REPLICA_URIS: List[PostgresDsn] = []
+    PG_REPLICA_SELECTION: Literal["round_robin", "least_busy"] = "least_busy"
+    PG_REPLICA_MAX_LAG_SECONDS: float = 10
+    PG_REPLICA_CHECK_SECONDS: float = 5
+    # Reads stay on primary for this long after a write made by this worker.
+    PG_READ_YOUR_WRITES_SECONDS: float = 15
+
+    @field_validator("PG_READ_YOUR_WRITES_SECONDS")
+    @classmethod
+    def cover_replica_lag(cls, v: float, info: ValidationInfo) -> float:
+        # Replica is used while its lag, checked every CHECK_SECONDS, is
+        # below MAX_LAG. A shorter window lets a read right after a write see
+        # the old data, and fill the cache with it just after invalidation.
+        values = info.data
+        lag = values["PG_REPLICA_MAX_LAG_SECONDS"] + values["PG_REPLICA_CHECK_SECONDS"]
+        if v < lag:
+            raise ValueError(
+                "PG_READ_YOUR_WRITES_SECONDS must cover replica max lag "
+                f"plus check interval, {lag}s",
+            )
+        return v
+
+    CACHE_ENABLED: bool = True
+    CACHE_TTL: int = 300
+    CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    # Users resolved from token subject. Short TTL bounds how long a change
+    # made outside of the API (e.g. straight in DB) stays unnoticed.
+    PRINCIPAL_CACHE_TTL: int = 30
+    PRINCIPAL_CACHE_MAX_BYTES: int = 1024 * 1024
+
+    # Prometheus text exposition, served outside of API_URL.
+    METRICS_ENABLED: bool = True
+    METRICS_URL: str = "/metrics"
+    # Bearer token scrapers have to send, metrics are open to anyone without it.
+    METRICS_TOKEN: Optional[SecretStr] = None
+
+    # Server-Timing header on this share of responses, 0..1.
+    SERVER_TIMING_ENABLED: bool = False
+    SERVER_TIMING_SAMPLE: float = 1.0
+
+    # Opt-in log of SQL statements slower than the threshold, with plans
+    # of a sampled share of them.
+    SLOW_QUERY_LOG_ENABLED: bool = False
+    SLOW_QUERY_THRESHOLD_MS: float = 200
+    SLOW_QUERY_EXPLAIN_SAMPLE: float = 0.1
+
+    # bcrypt releases the GIL, so workers hash in parallel on separate cores.
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+
+    # Rows per COPY of NDJSON import and per fetch of export cursor.
+    POST_IMPORT_BATCH_SIZE: int = 1000
+    POST_EXPORT_BATCH_SIZE: int = 500
+
 
 class Testing(BaseConfig):
     PROJECT_NAME: str = "Saigo blog API test"
+    SERVER_TIMING_ENABLED: bool = True
     PG_USER: str = "test"
     PG_PASS: str = "test"
     PG_DB: str = "test"
@@ -96,10 +165,13 @@ class Development(BaseConfig):
         "34d6b29a052a8b56ffc870a292f7dd62cda328b26eb440d363595116b17756fe",
     )
     JWT_EXPIRE_MINUTES: int = 1440
+    SERVER_TIMING_ENABLED: bool = True
 
 
 class Production(BaseConfig):
     PROJECT_NAME: str = "saigo.info"
+    # Metrics tell about routes and internals, enable them with a token.
+    METRICS_ENABLED: bool = False
 
 
 class PgConnectParams(BaseModel):
@@ -108,8 +180,27 @@ class PgConnectParams(BaseModel):
     echo_pool: bool = False
     pool_size: int = 5
     max_overflow: int = 5
+    pool_timeout: float = 30
+    pool_recycle: int = -1
+    connect_args: Dict[str, Any] = {}
     future: bool = True
 
+    @classmethod
+    def from_settings(cls, config: BaseConfig) -> "PgConnectParams":
+        # SQLAlchemy prepares statements itself, asyncpg caches the rest.
+        cache_size = config.PG_STATEMENT_CACHE_SIZE
+        return cls(
+            pool_pre_ping=config.PG_POOL_PRE_PING,
+            pool_size=config.PG_POOL_SIZE,
+            max_overflow=config.PG_POOL_MAX_OVERFLOW,
+            pool_timeout=config.PG_POOL_TIMEOUT,
+            pool_recycle=config.PG_POOL_RECYCLE,
+            connect_args={
+                "prepared_statement_cache_size": cache_size,
+                "statement_cache_size": cache_size,
+            },
+        )
+
 
 CONFIG = {
     "prod": Production,
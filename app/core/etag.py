@@ -0,0 +1,27 @@
+import hashlib
+from typing import Optional
+
+
+def make_etag(value: str, *, weak: bool = False) -> str:
+    etag = f'"{value}"'
+    return f"W/{etag}" if weak else etag
+
+
+def make_weak_etag(body: bytes) -> str:
+    """Validator of a response body which has no stored version."""
+    digest = hashlib.sha1(body, usedforsecurity=False).hexdigest()
+    return make_etag(digest[:20], weak=True)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/ prefix is ignored."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    return opaque(etag) in {opaque(tag) for tag in if_none_match.split(",")}
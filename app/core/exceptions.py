@@ -41,6 +41,10 @@ class InvalidCredentials(Exception401):
     detail = "Error validating credentials"
 
 
+class TokenRevoked(Exception401):
+    detail = "Token revoked"
+
+
 class InvalidEmailOrPassword(Exception401):
     detail = "Incorrect email or password"
 
@@ -68,3 +72,19 @@ class RoleInvalid(CustomHTTPException):
 class PageBadRequest(CustomHTTPException):
     status_code = status.HTTP_400_BAD_REQUEST
     detail = "Page outside of interval"
+
+
+class CursorBadRequest(CustomHTTPException):
+    status_code = status.HTTP_400_BAD_REQUEST
+    detail = "Invalid cursor"
+
+
+class ImportBadRequest(CustomHTTPException):
+    status_code = status.HTTP_400_BAD_REQUEST
+    detail = "Invalid import line"
+
+
+class ServiceBusy(CustomHTTPException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    detail = "Service busy, try again later"
+    headers = {"Retry-After": "1"}
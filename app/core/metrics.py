@@ -0,0 +1,295 @@
+import bisect
+import secrets
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50)
+
+# Requests that matched no route share one label, so scanners can't
+# blow up the amount of series.
+UNMATCHED_ROUTE = "unmatched"
+
+Labels = Tuple[str, ...]
+Collector = Callable[[], Dict[str, Any]]
+
+
+def escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def render_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    pairs = [f'{name}="{escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.sum += value
+        self.count += 1
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+
+
+class HistogramFamily:
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        *,
+        labels: Sequence[str],
+        buckets: Sequence[float],
+    ):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self.series: Dict[Labels, Histogram] = {}
+
+    def observe(self, labels: Labels, value: float) -> None:
+        histogram = self.series.get(labels)
+        if histogram is None:
+            histogram = self.series[labels] = Histogram(self.buckets)
+        histogram.observe(value)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        bucket_labels = [*self.labels, "le"]
+        for values, histogram in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                labels = render_labels(bucket_labels, [*values, f"{bound}"])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = render_labels(bucket_labels, [*values, "+Inf"])
+            lines.append(f"{self.name}_bucket{labels} {histogram.count}")
+            labels = render_labels(self.labels, values)
+            lines.append(f"{self.name}_sum{labels} {histogram.sum}")
+            lines.append(f"{self.name}_count{labels} {histogram.count}")
+        return lines
+
+
+class CounterFamily:
+    def __init__(self, name: str, help: str, *, labels: Sequence[str]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.series: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels, value: float = 1) -> None:
+        self.series[labels] = self.series.get(labels, 0) + value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for values, total in sorted(self.series.items()):
+            lines.append(f"{self.name}{render_labels(self.labels, values)} {total}")
+        return lines
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+
+
+# Set by the middleware for the time of a request, filled by engine events.
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "request_stats",
+    default=None,
+)
+
+
+class Metrics:
+    """
+    Process-wide request and DB metrics in Prometheus text format.
+    Collectors return flat dicts of numbers, exported as `app_<name>_<key>`
+    gauges: cache, pool and hashing pool stats plug in this way. Collectors
+    of one name tell their series apart by labels, e.g. each DB pool.
+    """
+
+    def __init__(self) -> None:
+        route = ("method", "route")
+        self.latency = HistogramFamily(
+            "http_request_duration_seconds",
+            "Time from request start to the last body chunk sent.",
+            labels=route,
+            buckets=LATENCY_BUCKETS,
+        )
+        self.responses = CounterFamily(
+            "http_responses_total",
+            "Responses by status code.",
+            labels=(*route, "status"),
+        )
+        self.size = HistogramFamily(
+            "http_response_size_bytes",
+            "Size of response body.",
+            labels=route,
+            buckets=SIZE_BUCKETS,
+        )
+        self.queries = HistogramFamily(
+            "db_queries_per_request",
+            "SQL statements executed by a request.",
+            labels=route,
+            buckets=QUERY_BUCKETS,
+        )
+        self.db_time = HistogramFamily(
+            "db_time_per_request_seconds",
+            "Time a request spent waiting for SQL statements.",
+            labels=route,
+            buckets=LATENCY_BUCKETS,
+        )
+        self.collectors: Dict[Tuple[str, Labels, Labels], Collector] = {}
+
+    def collect(self, name: str, collector: Collector, **labels: str) -> None:
+        self.collectors[(name, tuple(labels), tuple(labels.values()))] = collector
+
+    def observe_request(
+        self,
+        *,
+        method: str,
+        route: str,
+        status: int,
+        seconds: float,
+        size: int,
+        stats: RequestStats,
+    ) -> None:
+        labels = (method, route)
+        self.latency.observe(labels, seconds)
+        self.responses.inc((method, route, str(status)))
+        self.size.observe(labels, size)
+        self.queries.observe(labels, stats.queries)
+        self.db_time.observe(labels, stats.db_seconds)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for family in (
+            self.latency,
+            self.responses,
+            self.size,
+            self.queries,
+            self.db_time,
+        ):
+            lines.extend(family.render())
+
+        gauges: Dict[str, List[str]] = {}
+        for (name, names, values), collector in sorted(self.collectors.items()):
+            labels = render_labels(names, values)
+            for key, value in collector().items():
+                if isinstance(value, (int, float)):
+                    gauge = f"app_{name}_{key}"
+                    series = gauges.setdefault(gauge, [f"# TYPE {gauge} gauge"])
+                    series.append(f"{gauge}{labels} {float(value)}")
+        for series in gauges.values():
+            lines.extend(series)
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, records every HTTP request into `metrics`."""
+
+    def __init__(self, app: ASGIApp, registry: Metrics = metrics):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        start = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_stats.reset(token)
+            # Router puts matched route into the scope, path is its template.
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            self.registry.observe_request(
+                method=scope["method"],
+                route=route,
+                status=status,
+                seconds=time.perf_counter() - start,
+                size=size,
+                stats=stats,
+            )
+
+
+def before_cursor_execute(conn: Any, *args: Any) -> None:
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn: Any, *args: Any) -> None:
+    start = conn.info["query_start"].pop()
+    stats = request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - start
+
+
+def handle_error(context: Any) -> None:
+    # after_cursor_execute isn't called for a failed statement.
+    if context.connection is not None:
+        starts = context.connection.info.get("query_start")
+        if starts:
+            starts.pop()
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    target = engine.sync_engine
+    if event.contains(target, "before_cursor_execute", before_cursor_execute):
+        return
+    event.listen(target, "before_cursor_execute", before_cursor_execute)
+    event.listen(target, "after_cursor_execute", after_cursor_execute)
+    event.listen(target, "handle_error", handle_error)
+
+
+def scrape_allowed(request: Request) -> bool:
+    token = settings.METRICS_TOKEN
+    if token is None:
+        return True
+    expected = f"Bearer {token.get_secret_value()}"
+    return secrets.compare_digest(request.headers.get("Authorization", ""), expected)
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    if not scrape_allowed(request):
+        return Response(status_code=401, headers={"WWW-Authenticate": "Bearer"})
+    return Response(metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
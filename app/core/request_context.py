@@ -0,0 +1,37 @@
+from contextvars import ContextVar
+from typing import Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Scope of the HTTP request being handled, the router adds matched route
+# to this very dict later on.
+request_scope: ContextVar[Optional[Scope]] = ContextVar(
+    "request_scope",
+    default=None,
+)
+
+
+class RequestContextMiddleware:
+    """Makes the current request known to code below it, e.g. engine events."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = request_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_scope.reset(token)
+
+
+def current_route() -> Optional[str]:
+    """Path template of the route handling current request, if known."""
+    scope = request_scope.get()
+    if scope is None:
+        return None
+    return getattr(scope.get("route"), "path", None)
@@ -1,15 +1,23 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict
+from typing import Any, Callable, Dict, TypeVar
 
 from jose import jwt
 from passlib.context import CryptContext
 
+from app.core import exceptions
 from app.core.config import settings
 
+T = TypeVar("T")
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
-def create_access_token(subject: str) -> str:
+def create_access_token(subject: str, **claims: Any) -> str:
     time_now = datetime.now(timezone.utc)
     expire = time_now + timedelta(minutes=settings.JWT_EXPIRE_MINUTES)
 
@@ -18,6 +26,7 @@ def create_access_token(subject: str) -> str:
         "iat": datetime.now(timezone.utc),
         "exp": expire,
         "sub": subject,
+        **claims,
     }
 
     encoded_jwt = jwt.encode(
@@ -37,9 +46,95 @@ def verify_access_token(token: str) -> Dict[str, Any]:
     return payload
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+@dataclass
+class HashingStats:
+    queued: int = 0
+    running: int = 0
+    completed: int = 0
+    rejected: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+
+
+class HashingPool:
+    """
+    Bounded thread pool for bcrypt, which takes hundreds of milliseconds
+    of CPU per call and would stall the event loop otherwise.
+    **Parameters**
+    * `workers`: Amount of hashes computed at once
+    * `max_queue`: Calls waiting for a worker, beyond that `ServiceBusy` is raised
+    """
+
+    def __init__(self, *, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.stats = HashingStats()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="password-hash",
+        )
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            if self.stats.queued >= self.max_queue:
+                self.stats.rejected += 1
+                raise exceptions.ServiceBusy
+            self.stats.queued += 1
+
+        submitted = time.perf_counter()
+        # Set by whoever takes the call out of the queue: the worker starting
+        # it, or the caller giving up on it while it's still queued.
+        dequeued = False
+
+        def call() -> T:
+            nonlocal dequeued
+            waited = time.perf_counter() - submitted
+            with self._lock:
+                if dequeued:
+                    # Caller was cancelled, nobody needs the hash anymore.
+                    raise CancelledError
+                dequeued = True
+                self.stats.queued -= 1
+                self.stats.running += 1
+                self.stats.wait_seconds_total += waited
+                self.stats.wait_seconds_max = max(self.stats.wait_seconds_max, waited)
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self.stats.running -= 1
+                    self.stats.completed += 1
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, call)
+        finally:
+            # Cancelled caller (client gone, timeout) cancels the executor
+            # future as well, then `call()` never runs to free the slot.
+            with self._lock:
+                if not dequeued:
+                    dequeued = True
+                    self.stats.queued -= 1
+
+    def info(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **asdict(self.stats),
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+            }
+
+
+hashing_pool = HashingPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await hashing_pool.run(pwd_context.verify, plain_password, hashed_password)
 
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+async def get_password_hash(password: str) -> str:
+    return await hashing_pool.run(pwd_context.hash, password)
@@ -0,0 +1,138 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class ServerTiming:
+    """
+    Durations of request segments for `Server-Timing` header, in seconds.
+    * `auth`: token check in `verify_user_token`
+    * `db`: SQL statements, including those made for auth
+    * `validation`: response model validation, from endpoint return to render
+    * `json`: rendering response body
+    * `app`: everything until the response starts
+    """
+
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.durations: Dict[str, float] = {}
+        self.endpoint_done: Optional[float] = None
+
+    def add(self, name: str, seconds: float) -> None:
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    def header(self) -> str:
+        durations = {**self.durations, "app": time.perf_counter() - self.start}
+        return ", ".join(
+            f"{name};dur={seconds * 1000:.2f}" for name, seconds in durations.items()
+        )
+
+
+# Set only for sampled requests, everything below is a no-op otherwise.
+server_timing: ContextVar[Optional[ServerTiming]] = ContextVar(
+    "server_timing",
+    default=None,
+)
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    timing = server_timing.get()
+    if timing is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.add(name, time.perf_counter() - start)
+
+
+def mark_endpoint_done() -> None:
+    timing = server_timing.get()
+    if timing is not None:
+        timing.endpoint_done = time.perf_counter()
+
+
+class TimedJSONResponse(ORJSONResponse):
+    """Default response class: JSON encoded by orjson, timed when sampled."""
+
+    def render(self, content: Any) -> bytes:
+        timing = server_timing.get()
+        if timing is None:
+            return super().render(content)
+
+        start = time.perf_counter()
+        if timing.endpoint_done is not None:
+            timing.add("validation", start - timing.endpoint_done)
+            timing.endpoint_done = None
+        try:
+            return super().render(content)
+        finally:
+            timing.add("json", time.perf_counter() - start)
+
+
+class ServerTimingMiddleware:
+    """Adds `Server-Timing` header to a sampled share of responses."""
+
+    def __init__(self, app: ASGIApp, *, sample: float = 1.0):
+        self.app = app
+        self.sample = sample
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or random.random() >= self.sample:
+            await self.app(scope, receive, send)
+            return
+
+        timing = ServerTiming()
+        token = server_timing.set(timing)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", timing.header())
+                # Lets pages of other origins read it via Resource Timing API.
+                headers.append("Timing-Allow-Origin", "*")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            server_timing.reset(token)
+
+
+def before_cursor_execute(conn: Any, *args: Any) -> None:
+    if server_timing.get() is not None:
+        conn.info.setdefault("timing_start", []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn: Any, *args: Any) -> None:
+    timing = server_timing.get()
+    starts = conn.info.get("timing_start")
+    if timing is not None and starts:
+        timing.add("db", time.perf_counter() - starts.pop())
+
+
+def handle_error(context: Any) -> None:
+    if context.connection is not None:
+        starts = context.connection.info.get("timing_start")
+        if starts:
+            starts.pop()
+
+
+def time_queries(engine: AsyncEngine) -> None:
+    target = engine.sync_engine
+    if event.contains(target, "before_cursor_execute", before_cursor_execute):
+        return
+    event.listen(target, "before_cursor_execute", before_cursor_execute)
+    event.listen(target, "after_cursor_execute", after_cursor_execute)
+    event.listen(target, "handle_error", handle_error)
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Any, List, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.request_context import current_route
+
+logger = logging.getLogger(__name__)
+
+
+def redact(parameters: Any) -> List[str]:
+    # Types are enough to reproduce a plan, values may be personal data.
+    if isinstance(parameters, dict):
+        parameters = list(parameters.values())
+    if not isinstance(parameters, (list, tuple)):
+        return []
+    return [f"<{type(value).__name__}>" for value in parameters]
+
+
+class SlowQueryLog:
+    """
+    Logs SQL statements slower than a threshold along with route which ran
+    them. For a sampled part of slow SELECTs also logs their plan from
+    `EXPLAIN (ANALYZE, BUFFERS)`, run in background on a separate connection,
+    so the request itself isn't delayed. ANALYZE executes the query once
+    more, that's why only SELECTs and one plan at a time.
+    **Parameters**
+    * `threshold`: Seconds, statements running longer are logged
+    * `explain_sample`: Share of slow SELECTs, 0..1, to get a plan for
+    """
+
+    def __init__(self, *, threshold: float, explain_sample: float):
+        self.threshold = threshold
+        self.explain_sample = explain_sample
+        self.tasks: Set[asyncio.Task] = set()
+        self._engines: Set[int] = set()
+
+    def instrument(self, engine: AsyncEngine) -> None:
+        if id(engine) in self._engines:
+            return
+        self._engines.add(id(engine))
+
+        def before_cursor_execute(conn: Any, *args: Any) -> None:
+            conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+        def after_cursor_execute(
+            conn: Any,
+            cursor: Any,
+            statement: str,
+            parameters: Any,
+            context: Any,
+            executemany: bool,
+        ) -> None:
+            start = conn.info["slow_query_start"].pop()
+            elapsed = time.perf_counter() - start
+            if elapsed >= self.threshold:
+                self.report(engine, statement, parameters, elapsed)
+
+        def handle_error(context: Any) -> None:
+            if context.connection is not None:
+                starts = context.connection.info.get("slow_query_start")
+                if starts:
+                    starts.pop()
+
+        target = engine.sync_engine
+        event.listen(target, "before_cursor_execute", before_cursor_execute)
+        event.listen(target, "after_cursor_execute", after_cursor_execute)
+        event.listen(target, "handle_error", handle_error)
+
+    def report(
+        self,
+        engine: AsyncEngine,
+        statement: str,
+        parameters: Any,
+        elapsed: float,
+    ) -> None:
+        route = current_route() or "-"
+        logger.warning(
+            "Slow query %.1fms route=%s params=%s\n%s",
+            elapsed * 1000,
+            route,
+            redact(parameters),
+            statement,
+        )
+        if self.should_explain(statement):
+            task = asyncio.get_running_loop().create_task(
+                self.explain(engine, statement, parameters, route),
+            )
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    def should_explain(self, statement: str) -> bool:
+        if self.tasks or not statement.lstrip().upper().startswith("SELECT"):
+            return False
+        return random.random() < self.explain_sample
+
+    async def explain(
+        self,
+        engine: AsyncEngine,
+        statement: str,
+        parameters: Any,
+        route: Optional[str],
+    ) -> None:
+        try:
+            async with engine.connect() as conn:
+                result = await conn.exec_driver_sql(
+                    f"EXPLAIN (ANALYZE, BUFFERS) {statement}",
+                    parameters,
+                )
+                plan = "\n".join(row[0] for row in result)
+        except Exception:
+            logger.exception("Can't explain slow query of route=%s", route)
+            return
+        logger.warning("Plan of slow query route=%s\n%s", route, plan)
+
+
+slow_query_log = SlowQueryLog(
+    threshold=settings.SLOW_QUERY_THRESHOLD_MS / 1000,
+    explain_sample=settings.SLOW_QUERY_EXPLAIN_SAMPLE,
+)
@@ -0,0 +1,90 @@
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models import Account
+
+
+class TokenEpochs:
+    """
+    Current token epoch of every account, kept as plain `{id: epoch}`.
+    **Parameters**
+    * `refresh_interval`: Seconds between incremental refreshes
+    * `reload_interval`: Seconds between full reloads
+
+    Epochs come from one sequence, so an incremental refresh reads only
+    accounts with epoch above the highest one seen. Deleted accounts and
+    bumps committed out of sequence order are picked up by the full reload,
+    which bounds how long a revoked token may still pass in other workers.
+    Accounts missing from the map, or with a token newer than their epoch,
+    are looked up by id, a watermark scan can skip them for the same reason.
+    Writes made by this process are applied right away via `set()`.
+    """
+
+    def __init__(self, *, refresh_interval: float, reload_interval: float):
+        self.refresh_interval = refresh_interval
+        self.reload_interval = reload_interval
+        self.clear()
+
+    def clear(self) -> None:
+        self.epochs: Dict[int, int] = {}
+        self.watermark = 0
+        self.refreshed = float("-inf")
+        self.reloaded = float("-inf")
+
+    def set(self, account_id: int, epoch: int) -> None:
+        self.epochs[account_id] = epoch
+
+    def discard(self, account_id: int) -> None:
+        self.epochs.pop(account_id, None)
+
+    async def refresh(self, db: AsyncSession, *, force: bool = False) -> None:
+        now = time.monotonic()
+        full = now - self.reloaded >= self.reload_interval
+        if not (full or force or now - self.refreshed >= self.refresh_interval):
+            return
+
+        stmt = select(Account.id, Account.token_epoch)
+        if not full:
+            stmt = stmt.where(Account.token_epoch > self.watermark)
+        rows = (await db.execute(stmt)).all()
+
+        epochs = {} if full else self.epochs
+        epochs.update((row.id, row.token_epoch) for row in rows)
+        self.epochs = epochs
+        self.watermark = max(self.watermark, *epochs.values(), 0)
+        self.refreshed = now
+        if full:
+            self.reloaded = now
+
+    async def load(self, db: AsyncSession, *, account_id: int) -> Optional[int]:
+        stmt = select(Account.token_epoch).where(Account.id == account_id)
+        epoch = (await db.execute(stmt)).scalar_one_or_none()
+        if epoch is None:
+            self.discard(account_id)
+        else:
+            self.set(account_id, epoch)
+        return epoch
+
+    async def is_current(
+        self,
+        db: AsyncSession,
+        *,
+        account_id: int,
+        epoch: int,
+    ) -> bool:
+        await self.refresh(db)
+        current = self.epochs.get(account_id)
+        if current is None or current < epoch:
+            # Account or its epoch is newer than the last refresh.
+            current = await self.load(db, account_id=account_id)
+        return current == epoch
+
+
+token_epochs = TokenEpochs(
+    refresh_interval=settings.TOKEN_EPOCH_REFRESH_SECONDS,
+    reload_interval=settings.TOKEN_EPOCH_RELOAD_SECONDS,
+)
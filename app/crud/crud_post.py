@@ -1,106 +1,392 @@
-from typing import Any, Dict, List, Optional, cast
+import functools
+import json
+from datetime import datetime
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Optional, Tuple
 
-from sqlalchemy import delete, select, update
+from sqlalchemy import (
+    DateTime,
+    Integer,
+    Text,
+    bindparam,
+    cast,
+    column,
+    delete,
+    insert,
+    literal,
+    literal_column,
+    null,
+    select,
+    table,
+    text,
+    true,
+    tuple_,
+    type_coerce,
+    update,
+)
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import JSONB, aggregate_order_by
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import ColumnElement, Select
 from sqlalchemy.sql.expression import func
+from sqlalchemy.sql.selectable import CTE
 
 from app import schemas
+from app.core.cache import cache, cached
 from app.crud.crud_base import CRUDBase
+from app.crud.crud_tag import upsert_tags
 from app.models import Account, Post
+from app.schemas.post import POST_DATE_FORMAT, gen_post_version, parse_post_date
 
+# Key is rendered as SQL literal so the expression is the same as in
+# `ix_post_tags` definition. A bound key (post_json -> $1) can't be matched
+# to the expression index in generic plans of prepared statements.
+post_tags = Post.post_json[literal_column("'tags'")]
 
-class CRUDPost(CRUDBase[Post]):
-    async def count_post_with_filters(
-        self,
-        db: AsyncSession,
-        *,
-        tags: Optional[List[str]] = None,
-    ) -> Optional[int]:
-        stmt = select(func.count()).select_from(self.model)
-        if tags:
-            stmt = stmt.filter(self.model.post_json["tags"].contains(tags))
-        count = (await db.execute(stmt)).scalar_one_or_none()
 
-        return count
+# Post fields stored as table columns instead of post_json keys.
+# Heavy text lives in own columns as well: post_json is detoasted as a whole
+# on any key access, while untouched columns aren't read at all.
+POST_COLUMNS = {"title", "description", "content", "created", "modified"}
 
-    async def get_all_posts(
-        self,
-        db: AsyncSession,
-        *,
-        offset: int,
-        limit: int,
-        sort: str,
-        order: Optional[str] = None,
-        tags: Optional[List[str]] = None,
-    ) -> List[schemas.PostFromDB]:
+# Length of description excerpt shown in listings.
+EXCERPT_LENGTH = 250
+
+# Columns filled by NDJSON import, same as keys of `CRUDPost.row_values`.
+IMPORT_COLUMNS = (
+    "account_id",
+    "post_id",
+    "title",
+    "description",
+    "content",
+    "excerpt",
+    "created",
+    "modified",
+    "version",
+    "post_json",
+)
+_import_columns = ", ".join(IMPORT_COLUMNS)
+
+# Import batches are COPYed into a staging table first, COPY itself can't
+# skip rows with post_id already taken.
+CREATE_IMPORT_TABLE = text(
+    f"CREATE TEMP TABLE post_import ON COMMIT DROP AS "
+    f"SELECT {_import_columns} FROM post WITH NO DATA",
+)
+INSERT_IMPORTED_TAGS = text(
+    "INSERT INTO tag (tag) "
+    "SELECT DISTINCT jsonb_array_elements_text(post_json -> 'tags') "
+    "FROM post_import ON CONFLICT (tag) DO NOTHING",
+)
+TRUNCATE_IMPORT_TABLE = text("TRUNCATE post_import")
+
+
+def json_date(column: ColumnElement) -> ColumnElement:
+    # Same text as `PostResponse` dates, those have no fractions.
+    return func.to_char(
+        func.timezone("UTC", column),
+        'YYYY-MM-DD"T"HH24:MI:SS',
+    )
+
+
+def render_post(
+    *,
+    post_id: Any,
+    writer: Any,
+    title: Any,
+    description: Any,
+    content: Any,
+    tags: Any,
+    created: Any,
+    modified: Any,
+    estimated: Any,
+) -> ColumnElement:
+    """
+    JSON of `PostResponse` built by Postgres, same keys in the same order.
+    Python values have to be cast: untyped binds can't go to
+    json_build_object(VARIADIC "any").
+    """
+    return func.json_build_object(
+        "post_id",
+        post_id,
+        "writer",
+        writer,
+        "title",
+        title,
+        "description",
+        description,
+        "content",
+        content,
+        "tags",
+        tags,
+        "created",
+        json_date(created),
+        "modified",
+        json_date(modified),
+        "estimated",
+        estimated,
+    )
+
+
+def writer_name(account_id: Any) -> ColumnElement:
+    return select(Account.fullname).where(Account.id == account_id).scalar_subquery()
+
+
+def render_stored(columns: Any) -> ColumnElement:
+    """Rendered post of a `post` row, or a row of a table with its columns."""
+    post_json = type_coerce(columns.post_json, JSONB)
+    return cast(
+        render_post(
+            post_id=columns.post_id,
+            writer=writer_name(columns.account_id),
+            title=columns.title,
+            description=columns.description,
+            content=columns.content,
+            tags=post_json["tags"],
+            created=columns.created,
+            modified=columns.modified,
+            estimated=cast(post_json["estimated"].astext, Integer),
+        ),
+        Text,
+    )
+
+
+post_import = table("post_import", *(column(name) for name in IMPORT_COLUMNS))
+
+# Rare enough for postgresql.insert() being compiled on every call.
+INSERT_IMPORTED_POSTS = (
+    postgresql.insert(Post)
+    .from_select(
+        [*IMPORT_COLUMNS, "rendered"],
+        select(
+            *(post_import.c[name] for name in IMPORT_COLUMNS),
+            render_stored(post_import.c),
+        ),
+    )
+    .on_conflict_do_nothing(index_elements=[Post.post_id])
+    .returning(Post.post_id)
+)
+
+
+def format_post_date(value: Optional[datetime]) -> Optional[str]:
+    return value.strftime(POST_DATE_FORMAT) if value else None
+
+
+def post_tag(*, post_id: str) -> Tuple[str]:
+    return (f"post:{post_id}",)
+
+
+class CRUDPost(CRUDBase[Post]):
+    def tags_filter(self, tags: List[str]) -> ColumnElement:
+        # JSONB containment (@>) served by `ix_post_tags` (jsonb_path_ops GIN).
+        return post_tags.contains(tags)
+
+    def listing_select(self) -> Select:
         columns = [
             Post.id,
             Post.post_id,
-            Post.post_json["title"].astext.label("title"),
-            func.left(Post.post_json["description"].astext, 250).label("description"),
-            Post.post_json["created"].astext.label("created"),
-            Post.post_json["modified"].astext.label("modified"),
+            Post.title,
+            Post.excerpt.label("description"),
+            Post.created,
+            Post.modified,
             Post.post_json["tags"].label("tags"),
-            Post.post_json["estimated"].astext.label("estimated"),
+            Post.post_json["estimated"].as_integer().label("estimated"),
             Account.fullname.label("writer"),
             Account.id.label("writer_id"),
         ]
+        return select(columns).join(Account)
 
-        stmt = select(columns).join(Account).offset(offset).limit(limit)
-
+    def sort_expression(self, sort: str, order: Optional[str] = None) -> List[Any]:
         # TODO: id is invalid sort field since post_id with uuid type added. Fix it.
-        sort_models_dict: Dict[str, Any] = {
-            "id": Post.id,
-            "created": Post.post_json["created"],
+        # Id breaks ties, so pages are stable and (created, id) index serves it.
+        sort_models_dict: Dict[str, List[Any]] = {
+            "id": [Post.id],
+            "created": [Post.created, Post.id],
         }
         sort_model = sort_models_dict[sort]
 
         # TODO: perhaps I should map string to SA operator asc() or desc()
         if order:
             if order == "asc":
-                sort_model = sort_model.asc()
+                sort_model = [column.asc() for column in sort_model]
             elif order == "desc":
-                sort_model = sort_model.desc()
+                sort_model = [column.desc() for column in sort_model]
+
+        return sort_model
+
+    @cached(cache, "posts")
+    async def get_page_json(
+        self,
+        db: AsyncSession,
+        *,
+        page: int,
+        page_size: int,
+        sort: str,
+        order: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+    ) -> Tuple[int, str]:
+        """
+        Page of posts together with total amount of filtered posts in one
+        statement, rendered by Postgres into JSON of `PageResponse`. Rows never
+        become Python objects, the text goes to the client as is.
+        """
+        stmt = self.page_json_select(sort, order, bool(tags))
+        params = {
+            "page": page,
+            "page_size": page_size,
+            "offset": (page - 1) * page_size,
+            "tags": tags or [],
+        }
+        total_records, content = (await db.execute(stmt, params)).one()
+        return total_records, content
+
+    # CRUD objects are module singletons, holding them in cache is fine.
+    @functools.lru_cache(maxsize=None)  # noqa: B019
+    def page_json_select(
+        self,
+        sort: str,
+        order: Optional[str],
+        filtered: bool,
+    ) -> Select:
+        # Built once per shape with bound parameters: construction of this
+        # statement costs more than running it for a small page.
+        sort_model = self.sort_expression(sort, order)
+        page = bindparam("page", type_=Integer)
+        page_size = bindparam("page_size", type_=Integer)
+        tags = bindparam("tags", type_=JSONB)
+
+        total_stmt = select(func.count().label("total_records")).select_from(Post)
+        page_stmt = (
+            self.listing_select()
+            .add_columns(func.row_number().over(order_by=sort_model).label("position"))
+            .order_by(*sort_model)
+            .offset(bindparam("offset", type_=Integer))
+            .limit(page_size)
+        )
+        if filtered:
+            total_stmt = total_stmt.filter(self.tags_filter(tags))
+            page_stmt = page_stmt.filter(self.tags_filter(tags))
+
+        total = total_stmt.subquery("total")
+        rows = page_stmt.subquery("page")
+        post = render_post(
+            post_id=rows.c.post_id,
+            writer=rows.c.writer,
+            title=rows.c.title,
+            description=rows.c.description,
+            content=null(),
+            tags=rows.c.tags,
+            created=rows.c.created,
+            modified=rows.c.modified,
+            estimated=cast(rows.c.estimated, Integer),
+        )
+        data = select(
+            func.coalesce(
+                func.json_agg(aggregate_order_by(post, rows.c.position)),
+                text("'[]'::json"),
+            ),
+        ).scalar_subquery()
+        payload = func.json_build_object(
+            "current_page",
+            cast(page, Integer),
+            "total_pages",
+            cast(func.div(total.c.total_records + page_size - 1, page_size), Integer),
+            "page_size",
+            cast(page_size, Integer),
+            "total_records",
+            total.c.total_records,
+            "filter_tags",
+            cast(tags, JSONB),
+            "data",
+            data,
+        )
+        return select(total.c.total_records, cast(payload, Text))
+
+    @cached(cache, "posts")
+    async def get_posts_by_cursor(
+        self,
+        db: AsyncSession,
+        *,
+        limit: int,
+        order: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        cursor: Optional[schemas.PostCursor] = None,
+    ) -> Tuple[List[schemas.PostFromDB], bool]:
+        """
+        Keyset pagination over (created, id). Returns posts in requested order
+        and a flag telling whether more rows exist in the scan direction.
+        """
+        key = tuple_(Post.created, Post.id)
+
+        # Walking backward means scanning in the opposite order and
+        # flipping the rows afterwards.
+        descending = (order == "desc") != bool(cursor and cursor.backward)
 
-        stmt = stmt.order_by(sort_model)
+        stmt = self.listing_select()
+        if cursor:
+            position = tuple_(cursor.created, cursor.id)
+            stmt = stmt.filter(key < position if descending else key > position)
 
         if tags:
-            stmt = stmt.filter(Post.post_json["tags"].contains(tags))
+            stmt = stmt.filter(self.tags_filter(tags))
 
-        rows = (await db.execute(stmt)).all()
-        posts = [schemas.PostFromDB(**row._mapping) for row in rows]
+        if descending:
+            stmt = stmt.order_by(Post.created.desc(), Post.id.desc())
+        else:
+            stmt = stmt.order_by(Post.created.asc(), Post.id.asc())
 
-        return posts
+        # One extra row tells if there is anything beyond this page.
+        rows = (await db.execute(stmt.limit(limit + 1))).all()
+        has_more = len(rows) > limit
+        posts = [
+            schemas.PostFromDB.model_construct(**row._mapping) for row in rows[:limit]
+        ]
+
+        if cursor and cursor.backward:
+            posts.reverse()
 
-    async def get_post_id(
+        return posts, has_more
+
+    @cached(cache, "post", tags=post_tag)
+    async def get_rendered_post(
         self,
         db: AsyncSession,
         *,
         post_id: str,
-    ) -> Optional[schemas.PostFromDB]:
-        columns = [
-            Post.id,
-            Post.post_id,
-            Post.post_json.label("data"),
-            Account.id.label("writer_id"),
-            Account.fullname.label("writer"),
-        ]
-        stmt = select(columns).join(Account).filter(Post.post_id == post_id)
+    ) -> Optional[Tuple[str, str]]:
+        """`PostResponse` JSON rendered on write, along with post version."""
+        stmt = select(Post.rendered, Post.version).filter(Post.post_id == post_id)
         row = (await db.execute(stmt)).one_or_none()
-        if row:
-            # TODO: Make plain Dict without nested json 'data'.
-            # Maybe it is better do this in DB?
-            post_data: Dict = {}
-            for key, value in row._mapping.items():
-                if key == "data":
-                    for k, v in value.items():  # type: ignore
-                        post_data[k] = v
-                else:
-                    post_data[key] = value
+        return (row.rendered, row.version) if row else None
 
-            return schemas.PostFromDB(**post_data)
+    @cached(cache, "post", tags=post_tag)
+    async def get_post_version(
+        self,
+        db: AsyncSession,
+        *,
+        post_id: str,
+    ) -> Optional[str]:
+        stmt = select(Post.version).filter(Post.post_id == post_id)
+        return (await db.execute(stmt)).scalar_one_or_none()
 
-        return None
+    def row_values(
+        self,
+        *,
+        user_id: int,
+        obj_in: schemas.CreatePostInDB,
+    ) -> Dict[str, Any]:
+        # Title and dates live in typed columns, the rest stays in post_json.
+        return {
+            "account_id": user_id,
+            "post_id": obj_in.post_id,
+            "title": obj_in.title,
+            "description": obj_in.description,
+            "content": obj_in.content,
+            "excerpt": obj_in.description[:EXCERPT_LENGTH],
+            "created": parse_post_date(obj_in.created),
+            "modified": None,
+            "version": gen_post_version(),
+            "post_json": obj_in.model_dump(exclude={"post_id"} | POST_COLUMNS),
+        }
 
     async def create_post(
         self,
@@ -109,18 +395,56 @@ class CRUDPost(CRUDBase[Post]):
         user_id: int,
         obj_in: schemas.CreatePostInDB,
     ) -> str:
-        new_post = Post(
-            account_id=user_id,
-            post_id=obj_in.post_id,
-            post_json=obj_in.model_dump(
-                exclude={"post_id"},
+        """Inserts the post and upserts its tags in one statement."""
+        values = self.row_values(user_id=user_id, obj_in=obj_in)
+        values["rendered"] = cast(
+            render_post(
+                post_id=cast(values["post_id"], Text),
+                writer=writer_name(user_id),
+                title=cast(obj_in.title, Text),
+                description=cast(obj_in.description, Text),
+                content=cast(obj_in.content, Text),
+                tags=cast(obj_in.tags, JSONB),
+                created=cast(values["created"], DateTime(timezone=True)),
+                modified=null(),
+                estimated=cast(obj_in.estimated, Integer),
             ),
+            Text,
         )
-        db.add(new_post)
+        inserted = (
+            insert(self.model)
+            .values(**values)
+            .returning(Post.post_id, Post.version)
+            .cte("inserted")
+        )
+        stmt = self.select_written(inserted, tags=obj_in.tags)
+        row = (await db.execute(stmt)).one()
         await db.commit()
-        await db.refresh(new_post)
 
-        return new_post.post_id
+        # Drop listings, tags and "not found" answer for this post_id.
+        cache.invalidate("posts", "tags", *post_tag(post_id=row.post_id))
+
+        return row.post_id
+
+    def select_written(self, written: CTE, *, tags: Optional[List[Any]]) -> Select:
+        """
+        Result of a post write CTE, its post_id and version. Given tags are
+        upserted by one more CTE, only if the write has returned a row.
+        SQLAlchemy renders only referenced CTEs, hence the count of new tags,
+        joined after the write so its CTE is rendered first.
+        """
+        stmt = select(written.c.post_id, written.c.version)
+        if not tags:
+            return stmt
+        tags_upsert = upsert_tags(tags, after=written).cte("tags")
+        new_tags = (
+            select(func.count().label("new_tags"))
+            .select_from(tags_upsert)
+            .subquery("new_tags")
+        )
+        return stmt.add_columns(new_tags.c.new_tags).select_from(
+            written.join(new_tags, true()),
+        )
 
     async def update_post(
         self,
@@ -128,21 +452,167 @@ class CRUDPost(CRUDBase[Post]):
         *,
         post_id: str,
         obj_in: schemas.UpdatePostInDB,
-    ) -> str:
-        stmt = select(self.model).filter_by(post_id=post_id)
-        post_in_db = cast(Post, (await db.execute(stmt)).scalar_one_or_none())
-        new_post_data = post_in_db.post_json.copy()
-        new_post_data.update(obj_in.model_dump())
-
-        update_stmt = (
+    ) -> Optional[Tuple[str, str]]:
+        """
+        Merges the edit into stored post_json server-side and upserts its tags,
+        in one statement. Returns post_id and the new version, None when there
+        is no such post.
+        """
+        patch = obj_in.model_dump(exclude=POST_COLUMNS)
+        post_json = Post.post_json.op("||", return_type=JSONB)(literal(patch, JSONB))
+        modified = parse_post_date(obj_in.modified)
+        rendered = render_post(
+            post_id=Post.post_id,
+            writer=writer_name(Post.account_id),
+            title=cast(obj_in.title, Text),
+            description=cast(obj_in.description, Text),
+            content=cast(obj_in.content, Text),
+            tags=post_json["tags"],
+            created=Post.created,
+            modified=cast(modified, DateTime(timezone=True)),
+            estimated=cast(post_json["estimated"].astext, Integer),
+        )
+        updated = (
             update(self.model)
             .where(self.model.post_id == post_id)
-            .values(post_json=new_post_data)
+            .values(
+                post_json=post_json,
+                rendered=cast(rendered, Text),
+                title=obj_in.title,
+                description=obj_in.description,
+                content=obj_in.content,
+                excerpt=obj_in.description[:EXCERPT_LENGTH],
+                modified=modified,
+                version=gen_post_version(),
+            )
+            .returning(Post.post_id, Post.version)
+            .cte("updated")
+        )
+        stmt = self.select_written(updated, tags=obj_in.tags)
+        row = (await db.execute(stmt)).one_or_none()
+        await db.commit()
+        if row is None:
+            return None
+
+        cache.invalidate("posts", "tags", *post_tag(post_id=post_id))
+        return row.post_id, row.version
+
+    async def render_writer_posts(self, db: AsyncSession, *, account_id: int) -> None:
+        """Renders posts of the writer again, their JSON has writer's name."""
+        stmt = (
+            update(self.model)
+            .where(self.model.account_id == account_id)
+            .values(rendered=render_stored(Post), version=gen_post_version())
+            .returning(Post.post_id)
         )
+        post_ids = (await db.execute(stmt)).scalars().all()
+        await db.commit()
+
+        post_tags = [tag for post_id in post_ids for tag in post_tag(post_id=post_id)]
+        cache.invalidate("posts", *post_tags)
+
+    async def import_posts(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: int,
+        posts: AsyncIterable[schemas.ImportPostRequest],
+        batch_size: int,
+    ) -> Tuple[int, int]:
+        """
+        Loads posts with COPY in batches of `batch_size`, all of them in one
+        transaction. Posts with existing post_id are skipped, so a repeated
+        import of the same file is a no-op. Tags of every batch are upserted
+        in one statement. Returns amounts of imported and skipped posts.
+        """
+        # The transaction has to be started by SQLAlchemy, COPY on the bare
+        # driver connection would autocommit otherwise.
+        await db.execute(CREATE_IMPORT_TABLE)
+        connection = await (await db.connection()).get_raw_connection()
+        driver = connection.driver_connection
 
-        await db.execute(update_stmt)
+        imported: List[str] = []
+        skipped = 0
+        batch: List[Tuple[Any, ...]] = []
+
+        async def flush() -> None:
+            nonlocal skipped
+            await driver.copy_records_to_table(
+                "post_import",
+                records=batch,
+                columns=IMPORT_COLUMNS,
+            )
+            inserted = (await db.execute(INSERT_IMPORTED_POSTS)).scalars().all()
+            await db.execute(INSERT_IMPORTED_TAGS)
+            await db.execute(TRUNCATE_IMPORT_TABLE)
+            imported.extend(inserted)
+            skipped += len(batch) - len(inserted)
+            batch.clear()
+
+        async for item in posts:
+            batch.append(self.import_record(user_id=user_id, obj_in=item))
+            if len(batch) >= batch_size:
+                await flush()
+        if batch:
+            await flush()
         await db.commit()
-        return post_id
+
+        post_tags = [tag for post_id in imported for tag in post_tag(post_id=post_id)]
+        cache.invalidate("posts", "tags", *post_tags)
+        return len(imported), skipped
+
+    def import_record(
+        self,
+        *,
+        user_id: int,
+        obj_in: schemas.ImportPostRequest,
+    ) -> Tuple[Any, ...]:
+        fields = obj_in.model_dump(exclude_none=True, exclude={"modified"})
+        values = self.row_values(
+            user_id=user_id,
+            obj_in=schemas.CreatePostInDB(**fields),
+        )
+        if obj_in.modified:
+            values["modified"] = parse_post_date(obj_in.modified)
+        # asyncpg takes jsonb as text.
+        values["post_json"] = json.dumps(values["post_json"])
+        return tuple(values[column] for column in IMPORT_COLUMNS)
+
+    async def export_posts(
+        self,
+        db: AsyncSession,
+        *,
+        batch_size: int,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        All posts in the shape of import lines, read by a server-side cursor
+        `batch_size` rows at a time, so memory doesn't grow with the table.
+        """
+        stmt = (
+            select(
+                Post.post_id,
+                Post.title,
+                Post.description,
+                Post.content,
+                Post.created,
+                Post.modified,
+                Post.post_json,
+            )
+            .order_by(Post.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await db.stream(stmt)
+        async for rows in result.partitions():
+            for row in rows:
+                yield {
+                    "post_id": row.post_id,
+                    "title": row.title,
+                    "description": row.description,
+                    "content": row.content,
+                    **row.post_json,
+                    "created": format_post_date(row.created),
+                    "modified": format_post_date(row.modified),
+                }
 
     async def delete_by_post_id(
         self,
@@ -153,5 +623,7 @@ class CRUDPost(CRUDBase[Post]):
         await db.execute(stmt)
         await db.commit()
 
+        cache.invalidate("posts", *post_tag(post_id=post_id))
+
 
 post = CRUDPost(Post)
@@ -1,14 +1,36 @@
 from typing import List, Optional
 
-from sqlalchemy import select
-from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import Text, bindparam, select, text
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql.expression import func
+from sqlalchemy.sql.selectable import CTE, TextualSelect
 
 from app import schemas
+from app.core.cache import cache, cached
 from app.crud.crud_base import CRUDBase
 from app.models import Tag
 
+# Statements built with postgresql.insert() have no cache key in SQLAlchemy
+# 1.4 and are compiled on every execution, so ON CONFLICT is kept in text.
+UPSERT_TAGS = (
+    "INSERT INTO tag (tag) SELECT unnest(CAST(:tags AS TEXT[])) {where} "
+    "ON CONFLICT (tag) DO NOTHING RETURNING tag"
+)
+
+
+def upsert_tags(tags: List[str], *, after: Optional[CTE] = None) -> TextualSelect:
+    """
+    Set-based insert of missing tags, returns the inserted ones. Goes into
+    a CTE of post writes, so tags are stored by the same statement. With
+    `after` tags are inserted only if that write CTE has returned a row.
+    """
+    where = f"WHERE EXISTS (SELECT FROM {after.name})" if after is not None else ""
+    stmt = text(UPSERT_TAGS.format(where=where)).bindparams(
+        bindparam("tags", tags, type_=ARRAY(Text)),
+    )
+    return stmt.columns(tag=Text)
+
 
 class CRUDPost(CRUDBase[Tag]):
     async def count_tags(
@@ -21,20 +43,14 @@ class CRUDPost(CRUDBase[Tag]):
         count = (await db.execute(stmt)).scalar_one_or_none()
         return count
 
+    @cached(cache, "tags")
     async def get_all_tags(
         self,
         db: AsyncSession,
     ) -> schemas.TagsResponse:
         stmt = select(self.model.tag)
         all_tags = (await db.execute(stmt)).scalars().all()
-        return schemas.TagsResponse(tags=all_tags)
-
-    async def add_tags(self, db: AsyncSession, *, tags: List[str]) -> bool:
-        tags_insert = [{"tag": tag_name} for tag_name in tags]
-        stmt = insert(self.model).values(tags_insert).on_conflict_do_nothing()
-        await db.execute(stmt)
-        await db.commit()
-        return True
+        return schemas.TagsResponse.model_construct(tags=all_tags)
 
 
 tag = CRUDPost(Tag)
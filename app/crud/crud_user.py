@@ -1,12 +1,17 @@
-from typing import List, Optional, cast
+from typing import Any, Dict, List, Optional, cast
 
 from sqlalchemy import exists, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Update
 
 from app import schemas
-from app.core.security import verify_password
+from app.core.cache import cached, principal_cache
+from app.core.security import get_password_hash, verify_password
+from app.core.token_epochs import token_epochs
 from app.crud.crud_base import CRUDBase
+from app.crud.crud_post import post as crud_post
 from app.models import Account, Role
+from app.models.user import token_epoch_seq
 
 # Specifying columns we prevent nested elements in Row from SA.
 # Besides, it is right to select needed elements only.
@@ -58,6 +63,20 @@ class CRUDUser(CRUDBase[Account]):
 
         return None
 
+    @cached(principal_cache, "principals")
+    async def get_principal(
+        self,
+        db: AsyncSession,
+        *,
+        email: str,
+    ) -> Optional[schemas.UserFromDB]:
+        """
+        User behind token subject, cached for a short time.
+        Account writes drop all principals at once: they are rare and
+        address users by id, while entries are keyed by email.
+        """
+        return await self.get_user(db, email=email)
+
     async def authenticate(
         self,
         db: AsyncSession,
@@ -65,19 +84,26 @@ class CRUDUser(CRUDBase[Account]):
         email: str,
         password: str,
     ) -> Optional[schemas.UserAuth]:
-        stmt = select(
-            Account.email,
-            Account.hashed_password,
-            Account.disabled,
-        ).where(Account.email == email)
+        stmt = (
+            select(
+                Account.id,
+                Account.email,
+                Account.hashed_password,
+                Account.disabled,
+                Account.token_epoch,
+                Role.name.label("role_name"),
+            )
+            .join(Role)
+            .where(Account.email == email)
+        )
 
         user_in_db = (await db.execute(stmt)).one_or_none()
 
-        if user_in_db and verify_password(
+        if user_in_db and await verify_password(
             password,
             user_in_db.hashed_password,
         ):
-            return schemas.UserAuth(**user_in_db._mapping)
+            return schemas.UserAuth.model_construct(**user_in_db._mapping)
         return None
 
     async def get_all_users(
@@ -89,13 +115,26 @@ class CRUDUser(CRUDBase[Account]):
         users = [schemas.UserFromDB.model_construct(**row._mapping) for row in rows]
         return users
 
+    async def user_values(
+        self,
+        obj_in: schemas.UserToDB,
+        *,
+        exclude_none: bool = False,
+    ) -> Dict[str, Any]:
+        values = obj_in.model_dump(exclude_none=exclude_none)
+        if obj_in.password:
+            values["hashed_password"] = await get_password_hash(
+                obj_in.password.get_secret_value(),
+            )
+        return values
+
     async def create(
         self,
         db: AsyncSession,
         *,
         obj_in: schemas.UserToDB,
     ) -> schemas.UserFromDB:
-        new_user = Account(**obj_in.model_dump())
+        new_user = Account(**(await self.user_values(obj_in)))
 
         db.add(new_user)
         await db.commit()
@@ -117,17 +156,22 @@ class CRUDUser(CRUDBase[Account]):
         db_obj: schemas.UserFromDB,
         obj_in: schemas.UserToDB,
     ) -> schemas.UserFromDB:
+        # Role and disabled flag are token claims, so tokens are revoked.
         stmt = (
             update(self.model)
             .where(self.model.email == db_obj.email)
-            .values(**obj_in.model_dump(exclude_none=True))
-            # .returning(self.model)
-            # OR
-            # .execution_options(synchronize_session="fetch")
+            .values(
+                **(await self.user_values(obj_in, exclude_none=True)),
+                token_epoch=token_epoch_seq.next_value(),
+            )
+            .returning(self.model.id, self.model.token_epoch)
         )
 
-        await db.execute(stmt)
-        await db.commit()
+        await self.commit_epoch(db, stmt)
+
+        # Posts are stored rendered, writer's name included.
+        if obj_in.fullname != db_obj.fullname:
+            await crud_post.render_writer_posts(db, account_id=db_obj.id)
 
         updated_user = cast(
             schemas.UserFromDB,
@@ -153,9 +197,13 @@ class CRUDUser(CRUDBase[Account]):
         id: int,
         disabled: bool,
     ) -> bool:
-        stmt = update(self.model).where(self.model.id == id).values(disabled=disabled)
-        await db.execute(stmt)
-        await db.commit()
+        stmt = (
+            update(self.model)
+            .where(self.model.id == id)
+            .values(disabled=disabled, token_epoch=token_epoch_seq.next_value())
+            .returning(self.model.id, self.model.token_epoch)
+        )
+        await self.commit_epoch(db, stmt)
         return True
 
     async def change_password(
@@ -165,10 +213,37 @@ class CRUDUser(CRUDBase[Account]):
         id: int,
         password_hash: str,
     ) -> bool:
-        stmt = update(self.model).filter_by(id=id).values(hashed_password=password_hash)
-        await db.execute(stmt)
-        await db.commit()
+        stmt = (
+            update(self.model)
+            .filter_by(id=id)
+            .values(
+                hashed_password=password_hash,
+                token_epoch=token_epoch_seq.next_value(),
+            )
+            .returning(self.model.id, self.model.token_epoch)
+        )
+        await self.commit_epoch(db, stmt)
         return True
 
+    async def delete_by_id(
+        self,
+        db: AsyncSession,
+        id: int,
+    ) -> None:
+        await super().delete_by_id(db, id)
+        token_epochs.discard(id)
+        principal_cache.invalidate("principals")
+
+    async def commit_epoch(self, db: AsyncSession, stmt: Update) -> None:
+        """
+        Run account update bumping its token epoch and apply the new epoch
+        to this process at once; other workers see it on their next refresh.
+        """
+        rows = (await db.execute(stmt)).all()
+        await db.commit()
+        for row in rows:
+            token_epochs.set(row.id, row.token_epoch)
+        principal_cache.invalidate("principals")
+
 
 user = CRUDUser(Account)
@@ -0,0 +1,127 @@
+import asyncio
+import itertools
+import logging
+import time
+from typing import Any, Dict, List, Literal, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+logger = logging.getLogger(__name__)
+
+# Zero on a primary or a replica that replayed everything it received,
+# otherwise seconds since the last replayed transaction.
+REPLICA_LAG = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()),
+            0
+        )
+    END
+    """,
+)
+
+
+class Replica:
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        # Lag is unknown until the first check, reads stay on the primary.
+        self.healthy = False
+        self.lag: Optional[float] = None
+
+    @property
+    def busy(self) -> int:
+        return self.engine.sync_engine.pool.checkedout()  # type: ignore
+
+    def mark(self, lag: Optional[float], *, max_lag: float) -> None:
+        self.lag = lag
+        self.healthy = lag is not None and lag <= max_lag
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "url": self.engine.url.render_as_string(hide_password=True),
+            "healthy": self.healthy,
+            "lag": self.lag,
+            "busy": self.busy,
+        }
+
+
+class ReplicaRouter:
+    """
+    Picks a read replica for a read-only session, or None for the primary.
+    **Parameters**
+    * `engines`: Replica engines
+    * `selection`: `round_robin` or `least_busy` (fewest checked out connections)
+    * `read_your_writes`: Seconds after a commit on the primary in this process
+      while reads stay on the primary as well, should cover `max_lag` plus
+      `check_interval`
+    * `max_lag`: Replicas lagging more than this are evicted until they catch up
+    * `check_interval`: Seconds between health checks of replicas
+    """
+
+    def __init__(
+        self,
+        engines: List[AsyncEngine],
+        *,
+        selection: Literal["round_robin", "least_busy"] = "least_busy",
+        read_your_writes: float = 15,
+        max_lag: float = 10,
+        check_interval: float = 5,
+    ):
+        self.replicas = [Replica(engine) for engine in engines]
+        self.selection = selection
+        self.read_your_writes = read_your_writes
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.last_write = float("-inf")
+        self.checked = float("-inf")
+        self._turn = itertools.count()
+        self._check_task: Optional[asyncio.Task] = None
+
+    def note_write(self) -> None:
+        self.last_write = time.monotonic()
+
+    def pick(self) -> Optional[Replica]:
+        if not self.replicas:
+            return None
+        self.schedule_check()
+
+        if time.monotonic() - self.last_write < self.read_your_writes:
+            return None
+
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        if self.selection == "round_robin":
+            return healthy[next(self._turn) % len(healthy)]
+        return min(healthy, key=lambda replica: replica.busy)
+
+    def schedule_check(self) -> None:
+        # Health is checked in background, reads never wait for it.
+        if time.monotonic() - self.checked < self.check_interval:
+            return
+        if self._check_task and not self._check_task.done():
+            return
+        self.checked = time.monotonic()
+        self._check_task = asyncio.get_running_loop().create_task(self.check())
+
+    async def check(self) -> None:
+        for replica in self.replicas:
+            try:
+                async with replica.engine.connect() as conn:
+                    lag = (await conn.execute(REPLICA_LAG)).scalar_one()
+                replica.mark(float(lag), max_lag=self.max_lag)
+            except Exception:
+                logger.warning("Replica %s is unreachable", replica.engine.url)
+                replica.mark(None, max_lag=self.max_lag)
+        self.checked = time.monotonic()
+
+    def info(self) -> List[Dict[str, Any]]:
+        return [replica.info() for replica in self.replicas]
+
+
+def create_replica_engines(urls: List[str], **params: Any) -> List[AsyncEngine]:
+    return [create_async_engine(url, **params) for url in urls]
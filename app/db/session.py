@@ -1,13 +1,84 @@
-from typing import AsyncGenerator
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncGenerator, Dict
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import PgConnectParams, settings
+from app.db.replicas import ReplicaRouter, create_replica_engines
+
+
+@dataclass
+class PoolStats:
+    checkouts: int = 0
+    timeouts: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+    overflow_max: int = 0
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool which records how long checkouts wait for a connection.
+    Wait includes opening a new connection when the pool has room for it.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self) -> Any:
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.stats.wait_seconds_total += waited
+            self.stats.wait_seconds_max = max(self.stats.wait_seconds_max, waited)
+
+        self.stats.checkouts += 1
+        self.stats.overflow_max = max(self.stats.overflow_max, self.overflow())
+        return connection
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            **asdict(self.stats),
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            # Negative while the pool itself isn't filled up yet.
+            "overflow": max(0, self.overflow()),
+            "max_overflow": self._max_overflow,
+        }
+
+
+class PrimarySession(Session):
+    pass
+
+
+pg_params = PgConnectParams.from_settings(settings).model_dump()
 
 engine = create_async_engine(
     str(settings.PG_URI),
-    **PgConnectParams().model_dump(),
+    poolclass=InstrumentedQueuePool,
+    **pg_params,
+)
+
+replica_router = ReplicaRouter(
+    create_replica_engines(
+        [str(uri) for uri in settings.PG_REPLICA_URIS],
+        poolclass=InstrumentedQueuePool,
+        **pg_params,
+    ),
+    selection=settings.PG_REPLICA_SELECTION,
+    read_your_writes=settings.PG_READ_YOUR_WRITES_SECONDS,
+    max_lag=settings.PG_REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.PG_REPLICA_CHECK_SECONDS,
 )
 
 SessionLocal = sessionmaker(
@@ -16,12 +87,33 @@ SessionLocal = sessionmaker(
     expire_on_commit=False,
     bind=engine,
     class_=AsyncSession,
+    sync_session_class=PrimarySession,
 )
 
 
+@event.listens_for(PrimarySession, "after_commit")
+def note_write(session: Session) -> None:
+    # Only writes commit, reads just close the session.
+    replica_router.note_write()
+
+
+def pool_status(db_engine: AsyncEngine = engine) -> Dict[str, Any]:
+    return db_engine.sync_engine.pool.info()  # type: ignore[attr-defined]
+
+
 async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
     db = SessionLocal()
     try:
         yield db
     finally:
         await db.close()
+
+
+async def get_read_db_session() -> AsyncGenerator[AsyncSession, None]:
+    """Session for public reads, on a replica when there is a healthy one."""
+    replica = replica_router.pick()
+    db = SessionLocal(bind=replica.engine) if replica else SessionLocal()
+    try:
+        yield db
+    finally:
+        await db.close()
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Dict
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Optional
 
-from sqlalchemy import Column, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text, text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 
@@ -22,8 +23,29 @@ class Post(Base):
     )
     post_id: str = Column(String(10), nullable=False, default=False, unique=True)
     post_json: Dict = Column(JSONB(astext_type=Text()))
+    title: str = Column(Text, nullable=False)
+    description: str = Column(Text, nullable=False)
+    content: str = Column(Text, nullable=False)
+    excerpt: str = Column(Text, nullable=False)
+    created: datetime = Column(DateTime(timezone=True), nullable=False)
+    modified: Optional[datetime] = Column(DateTime(timezone=True))
+    version: str = Column(String(32), nullable=False)
+    # PostResponse JSON rendered on write, served by post page as is.
+    # Large values are compressed by TOAST.
+    rendered: str = Column(Text, nullable=False)
     account: Account = relationship("Account", back_populates="post")
 
+    __table_args__ = (
+        # Serves tags filtering: post_json -> 'tags' @> '["tag"]'
+        Index(
+            "ix_post_tags",
+            text("(post_json -> 'tags') jsonb_path_ops"),
+            postgresql_using="gin",
+        ),
+        # Listing sort and keyset pagination.
+        Index("ix_post_created_id", "created", "id"),
+    )
+
     # DATE YYYY-MM-DD HH24:MI
 
     # TODO: Do i need mutable changes in ORM session?
@@ -2,7 +2,17 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, SmallInteger, String, Text
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    ForeignKey,
+    Integer,
+    Sequence,
+    SmallInteger,
+    String,
+    Text,
+)
 from sqlalchemy.orm import relationship
 
 from app.db.meta import Base
@@ -11,6 +21,11 @@ if TYPE_CHECKING:
     from .post import Post
 
 
+# Single sequence for all accounts, so accounts changed since some moment
+# are the ones with token_epoch above the highest value seen by then.
+token_epoch_seq = Sequence("account_token_epoch_seq", metadata=Base.metadata)
+
+
 class Role(Base):
     id = Column(SmallInteger, autoincrement=False, primary_key=True)
     name = Column(String(30), nullable=False, unique=True)
@@ -28,5 +43,11 @@ class Account(Base):
         nullable=False,
         server_default="1",
     )
+    # Claimed by access tokens, bumping it revokes tokens issued before.
+    token_epoch: int = Column(
+        BigInteger,
+        nullable=False,
+        server_default=token_epoch_seq.next_value(),
+    )
     role: Role = relationship(Role, back_populates="account")
     post: Post = relationship("Post", back_populates="account")
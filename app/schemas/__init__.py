@@ -3,7 +3,11 @@ from .post import (
     CreatePostInDB,
     CreatePostRequest,
     CreatePostResponse,
+    CursorPageResponse,
+    ImportPostRequest,
+    ImportPostsResponse,
     PageResponse,
+    PostCursor,
     PostFromDB,
     PostResponse,
     TagsResponse,
@@ -1,8 +1,19 @@
+import base64
 import uuid
 from datetime import datetime, timezone
-from typing import List, Optional, Union
+from typing import List, Literal, Optional, Union
 
-from pydantic import BaseModel, Field, ValidationInfo, field_validator
+from pydantic import (
+    BaseModel,
+    Field,
+    ValidationInfo,
+    field_serializer,
+    field_validator,
+)
+
+POST_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+# Dates go out in UTC without offset, as they did when stored as strings.
+RESPONSE_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S"
 
 
 def gen_post_id(title: str) -> str:
@@ -10,7 +21,37 @@ def gen_post_id(title: str) -> str:
 
 
 def gen_post_date() -> str:
-    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    return datetime.now(timezone.utc).strftime(POST_DATE_FORMAT)
+
+
+def gen_post_version() -> str:
+    # Changes on every write, served as post ETag.
+    return uuid.uuid4().hex
+
+
+def parse_post_date(value: str) -> datetime:
+    # gen_post_date() always yields UTC time.
+    return datetime.strptime(value, POST_DATE_FORMAT).replace(tzinfo=timezone.utc)
+
+
+# Opaque keyset position used by cursor pagination. Keeps order and filter
+# of the listing it was issued for, it means nothing for any other listing.
+class PostCursor(BaseModel):
+    created: datetime
+    # Client controlled, keep it within the int4 primary key.
+    id: int = Field(ge=1, le=2**31 - 1)
+    backward: bool = False
+    order: Literal["asc", "desc"] = "asc"
+    tags: List[str] = []
+
+    def encode(self) -> str:
+        raw = base64.urlsafe_b64encode(self.model_dump_json().encode())
+        return raw.decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, cursor: str) -> "PostCursor":
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return cls.model_validate_json(base64.urlsafe_b64decode(padded))
 
 
 # ----> HTTP Responses schemas
@@ -31,6 +72,12 @@ class PostResponse(BaseModel):
     modified: Union[None, datetime]
     estimated: int
 
+    @field_serializer("created", "modified", when_used="json-unless-none")
+    def format_date(self, value: datetime) -> str:
+        if value.tzinfo:
+            value = value.astimezone(timezone.utc)
+        return value.strftime(RESPONSE_DATE_FORMAT)
+
 
 class PageResponse(BaseModel):
     current_page: int
@@ -41,6 +88,14 @@ class PageResponse(BaseModel):
     data: List[PostResponse]
 
 
+class CursorPageResponse(BaseModel):
+    page_size: int
+    filter_tags: List[str]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    data: List[PostResponse]
+
+
 class CreatePostResponse(BaseModel):
     post_id: str
 
@@ -49,6 +104,11 @@ class UpdatePostResponse(CreatePostResponse):
     pass
 
 
+class ImportPostsResponse(BaseModel):
+    imported: int
+    skipped: int
+
+
 # ----> HTTP Requests schemas
 
 
@@ -59,17 +119,39 @@ class CreatePostRequest(BaseModel):
     tags: Optional[List[str]] = []
     estimated: int
 
+    @field_validator("tags")
+    @classmethod
+    def null_tags(cls, v: Optional[List[str]]) -> List[str]:
+        # Null is stored and served as is otherwise, posts always have a list.
+        return v or []
+
 
 class UpdatePostRequest(CreatePostRequest):
     pass
 
 
+# One line of NDJSON import, export lines have the same shape.
+# Dates are in POST_DATE_FORMAT, missing post_id and created are generated.
+class ImportPostRequest(CreatePostRequest):
+    post_id: Optional[str] = None
+    created: Optional[str] = None
+    modified: Optional[str] = None
+
+    @field_validator("created", "modified")
+    @classmethod
+    def check_date(cls, v: Optional[str]) -> Optional[str]:
+        if v:
+            parse_post_date(v)
+        return v
+
+
 # ----> DB's schemas
 
 
 class PostFromDB(PostResponse):
     id: int
     writer_id: int
+    version: Optional[str] = None
 
 
 class PostToDB(BaseModel):
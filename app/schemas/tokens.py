@@ -6,5 +6,10 @@ class TokenResponse(BaseModel):
     token_type: str
 
 
+# Claims are enough to authorize a request without loading the account.
 class TokenPayload(BaseModel):
     sub: str
+    uid: int
+    role: str
+    disabled: bool
+    epoch: int
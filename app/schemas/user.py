@@ -6,12 +6,9 @@ from pydantic import (
     EmailStr,
     Field,
     SecretStr,
-    ValidationInfo,
     field_validator,
 )
 
-from app.core.security import get_password_hash
-
 value_error = "{} must be less than {} characters"
 EMAIL_MAX_LENGTH = 100
 
@@ -74,7 +71,7 @@ class UserFromDB(UserResponse):
     hashed_password: str
 
 
-# Put user to DB
+# Put user to DB. Password is hashed by CRUD off the event loop.
 class UserToDB(BaseModel):
     model_config = ConfigDict(validate_assignment=True)
 
@@ -87,17 +84,15 @@ class UserToDB(BaseModel):
 
     @field_validator("hashed_password", mode="after")
     @classmethod
-    def make_hashed_password(cls, v: str, info: ValidationInfo) -> str | None:
+    def forbid_hashed_password(cls, v: str | None) -> None:
         if v:
             raise ValueError("You cant supply hash by yourself!")
-
-        password = info.data["password"]
-        if password:
-            return get_password_hash(password.get_secret_value())
-
         return None
 
 
 class UserAuth(BaseModel):
+    id: int
     disabled: bool
     email: EmailStr
+    role_name: str
+    token_epoch: int
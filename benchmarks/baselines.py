@@ -0,0 +1,107 @@
+"""
+Read paths the app used before listings and posts were rendered to JSON by
+Postgres. Benchmarks time them against the current ones, nothing caches them.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, schemas
+from app.models import Account, Post
+
+
+async def count_posts(db: AsyncSession, *, tags: List[str]) -> int:
+    stmt = select(func.count()).select_from(Post)
+    if tags:
+        stmt = stmt.filter(crud.post.tags_filter(tags))
+    return (await db.execute(stmt)).scalar_one()
+
+
+async def get_posts(
+    db: AsyncSession,
+    *,
+    offset: int,
+    limit: int,
+    sort: str,
+    order: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+) -> List[schemas.PostFromDB]:
+    stmt = crud.post.listing_select().offset(offset).limit(limit)
+    stmt = stmt.order_by(*crud.post.sort_expression(sort, order))
+    if tags:
+        stmt = stmt.filter(crud.post.tags_filter(tags))
+
+    rows = (await db.execute(stmt)).all()
+    return [schemas.PostFromDB.model_construct(**row._mapping) for row in rows]
+
+
+async def get_page_with_count(
+    db: AsyncSession,
+    *,
+    offset: int,
+    limit: int,
+    sort: str,
+    order: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+) -> Tuple[int, List[schemas.PostFromDB]]:
+    """Page rows LEFT JOINed to the filtered total, in one round-trip."""
+    sort_model = crud.post.sort_expression(sort, order)
+
+    total_stmt = select(func.count().label("total_records")).select_from(Post)
+    page_stmt = (
+        crud.post.listing_select()
+        .add_columns(func.row_number().over(order_by=sort_model).label("position"))
+        .order_by(*sort_model)
+        .offset(offset)
+        .limit(limit)
+    )
+    if tags:
+        total_stmt = total_stmt.filter(crud.post.tags_filter(tags))
+        page_stmt = page_stmt.filter(crud.post.tags_filter(tags))
+
+    total = total_stmt.subquery("total")
+    page = page_stmt.subquery("page")
+    stmt = (
+        select(total.c.total_records, page)
+        .select_from(total.outerjoin(page, true()))
+        .order_by(page.c.position)
+    )
+
+    rows = (await db.execute(stmt)).all()
+    posts = [
+        schemas.PostFromDB.model_construct(**row._mapping)
+        for row in rows
+        if row.id is not None
+    ]
+    return rows[0].total_records, posts
+
+
+async def get_post(db: AsyncSession, *, post_id: str) -> Optional[schemas.PostFromDB]:
+    """Post row with its post_json keys flattened into the model."""
+    columns = [
+        Post.id,
+        Post.post_id,
+        Post.post_json.label("data"),
+        Post.title,
+        Post.description,
+        Post.content,
+        Post.created,
+        Post.modified,
+        Post.version,
+        Account.id.label("writer_id"),
+        Account.fullname.label("writer"),
+    ]
+    stmt = select(columns).join(Account).filter(Post.post_id == post_id)
+    row = (await db.execute(stmt)).one_or_none()
+    if not row:
+        return None
+
+    post_data: Dict[str, Any] = {}
+    for key, value in row._mapping.items():
+        if key == "data":
+            post_data.update(value)
+        else:
+            post_data[key] = value
+    return schemas.PostFromDB.model_construct(**post_data)
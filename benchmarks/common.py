@@ -0,0 +1,233 @@
+"""
+Shared helpers for benchmarks.
+
+Benchmarks run against the database of `test` settings and recreate its
+schema, same as the test suite does. Never point them to real data.
+"""
+
+import asyncio
+import contextlib
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import create_app, crud, schemas
+from app.core.config import get_settings
+from app.db.meta import Base
+from app.models import Post
+from app.schemas.post import POST_DATE_FORMAT
+
+settings = get_settings("test")
+
+engine = create_async_engine(str(settings.PG_URI), pool_size=10, max_overflow=0)
+
+session_local = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    bind=engine,
+    class_=AsyncSession,
+)
+
+TAGS = [f"tag{num}" for num in range(30)]
+
+# Real text, unlike a repeated char, compresses about as well as posts do.
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod "
+    "tempor incididunt ut labore et dolore magna aliqua postgres python "
+    "asyncio fastapi index query plan cache latency kubernetes nginx"
+).split()
+
+
+def words(size: int) -> str:
+    """Random text of about `size` characters."""
+    return " ".join(random.choices(WORDS, k=max(1, size // 7)))
+
+
+async def reset_db() -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            text("INSERT INTO role (id, name) VALUES (:id, :name)"),
+            [{"id": 1, "name": "admin"}, {"id": 2, "name": "user"}],
+        )
+
+
+async def create_admin(password: str = "bench-admin") -> schemas.UserToDB:
+    admin = schemas.UserToDB(
+        email="bench-admin@foobar.baz",
+        fullname="bench-admin",
+        password=password,
+        role_id=1,
+        disabled=False,
+    )
+    async with session_local() as db:
+        await crud.user.create(db, obj_in=admin)
+    return admin
+
+
+def make_post(
+    num: int,
+    *,
+    content_size: int = 8000,
+    created: Optional[datetime] = None,
+) -> schemas.CreatePostInDB:
+    # Zipf-like tag popularity: a few tags are on most of the posts.
+    tags = sorted({random.choice(TAGS[: random.randint(1, len(TAGS))]) for _ in "abc"})
+    post = schemas.CreatePostInDB(
+        title=f"Benchmark post number {num}",
+        description=words(random.randint(150, 600)),
+        content=words(random.randint(content_size // 2, content_size * 2)),
+        tags=tags,
+        estimated=random.randint(1, 30),
+    )
+    if created:
+        post.created = created.strftime(POST_DATE_FORMAT)
+    return post
+
+
+async def seed_posts(
+    count: int,
+    *,
+    account_id: int = 1,
+    content_size: int = 8000,
+    batch: int = 1000,
+) -> None:
+    # One post an hour up to now, so listings have distinct dates.
+    first = datetime.now(timezone.utc) - timedelta(hours=count)
+
+    async def posts() -> AsyncIterator[schemas.ImportPostRequest]:
+        for num in range(count):
+            post = make_post(
+                num,
+                content_size=content_size,
+                created=first + timedelta(hours=num),
+            )
+            yield schemas.ImportPostRequest(**post.model_dump())
+
+    async with session_local() as db:
+        await crud.post.import_posts(
+            db,
+            user_id=account_id,
+            posts=posts(),
+            batch_size=batch,
+        )
+        await db.execute(text("ANALYZE post"))
+        await db.commit()
+
+
+async def sample_post_ids(size: int = 1000) -> List[str]:
+    async with session_local() as db:
+        stmt = select(Post.post_id).order_by(func.random()).limit(size)
+        return list((await db.execute(stmt)).scalars())
+
+
+def app_client() -> AsyncClient:
+    """
+    Client of in-process app instance. The app uses its own engine, built
+    from `APP_` env, so run benchmarks with `APP_MODE=test`.
+    """
+    return AsyncClient(
+        transport=ASGITransport(app=create_app()),
+        base_url=f"http://bench{settings.API_URL}",
+    )
+
+
+async def measure(
+    func: Callable[[], Awaitable[Any]],
+    *,
+    iterations: int,
+    warmup: int = 10,
+) -> List[float]:
+    for _ in range(warmup):
+        await func()
+
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def run_concurrently(
+    func: Callable[[], Awaitable[Any]],
+    *,
+    requests: int,
+    concurrency: int,
+) -> Tuple[float, List[float]]:
+    """
+    Runs `func` `requests` times by `concurrency` workers.
+    Returns wall time and latency of every call.
+    """
+    remaining = requests
+    latencies: List[float] = []
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            await func()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - start, latencies
+
+
+class LoopLag:
+    """Measures how late a short sleep wakes up, i.e. event loop lag."""
+
+    def __init__(self, tick: float = 0.005):
+        self.tick = tick
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.tick)
+            self.samples.append(max(0.0, time.perf_counter() - start - self.tick))
+
+    def start(self) -> None:
+        self.samples = []
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> List[float]:
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+        return self.samples or [0.0]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Latency percentiles in milliseconds."""
+    ordered = sorted(samples)
+
+    def percentile(p: float) -> float:
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return round(ordered[index] * 1000, 3)
+
+    return {
+        "count": len(ordered),
+        "mean": round(statistics.fmean(ordered) * 1000, 3),
+        "p50": percentile(50),
+        "p95": percentile(95),
+        "p99": percentile(99),
+    }
+
+
+def report(result: Dict[str, Any]) -> None:
+    sys.stdout.write(json.dumps(result, indent=2) + "\n")
@@ -0,0 +1,107 @@
+"""
+Page of `/post/` built from rows in Python, validated against the response
+model and encoded, vs rendered to JSON by Postgres and passed through.
+Cache is off, every call goes to the database.
+
+    APP_MODE=test python -m benchmarks.listing_json --posts 10000
+"""
+
+import argparse
+import asyncio
+import math
+import time
+from typing import Any, Awaitable, Callable, Dict, Tuple, Union
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, schemas
+from app.core.cache import cache
+from benchmarks import baselines, common
+
+# Same validation and serialization FastAPI does for the endpoint.
+page_adapter = TypeAdapter(Union[schemas.PageResponse, schemas.CursorPageResponse])
+
+
+async def timed(
+    func: Callable[[], Awaitable[Any]],
+    iterations: int,
+) -> Dict[str, float]:
+    cpu = time.process_time()
+    result = common.summarize(await common.measure(func, iterations=iterations))
+    cpu_per_call = (time.process_time() - cpu) / (iterations + 10)
+    return {**result, "cpu_ms": round(cpu_per_call * 1000, 3)}
+
+
+def paths(
+    db: AsyncSession,
+    page_size: int,
+    page: int = 2,
+) -> Tuple[Callable[[], Awaitable[None]], Callable[[], Awaitable[None]]]:
+    async def models() -> None:
+        total, posts = await baselines.get_page_with_count(
+            db,
+            offset=(page - 1) * page_size,
+            limit=page_size,
+            sort="created",
+            order="desc",
+        )
+        content = page_adapter.validate_python(
+            {
+                "current_page": page,
+                "total_pages": math.ceil(total / page_size),
+                "page_size": page_size,
+                "total_records": total,
+                "filter_tags": [],
+                "data": posts,
+            },
+        )
+        JSONResponse(page_adapter.dump_python(content, mode="json"))
+
+    async def db_json() -> None:
+        await crud.post.get_page_json(
+            db,
+            page=page,
+            page_size=page_size,
+            sort="created",
+            order="desc",
+        )
+
+    return models, db_json
+
+
+async def main(args: argparse.Namespace) -> None:
+    cache.enabled = False
+    await common.reset_db()
+    await common.create_admin()
+    await common.seed_posts(args.posts, content_size=2000)
+
+    results = {}
+    async with common.session_local() as db:
+        for page_size in args.page_sizes:
+            models, db_json = paths(db, page_size)
+            before = await timed(models, args.iterations)
+            after = await timed(db_json, args.iterations)
+            results[str(page_size)] = {
+                "models": before,
+                "db_json": after,
+                "saved_mean_ms": round(before["mean"] - after["mean"], 3),
+            }
+
+    common.report(
+        {
+            "benchmark": "listing_json",
+            "params": vars(args),
+            "results": results,
+        },
+    )
+    await common.engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=10_000)
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[3, 20, 100])
+    parser.add_argument("--iterations", type=int, default=300)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,64 @@
+"""
+Listing latency: separate count + page queries vs single combined query.
+Cache is off, every call goes to the database.
+
+    APP_MODE=test python -m benchmarks.listing_roundtrip --posts 5000
+"""
+
+import argparse
+import asyncio
+
+from app.core.cache import cache
+from benchmarks import baselines, common
+
+
+async def main(args: argparse.Namespace) -> None:
+    cache.enabled = False
+    await common.reset_db()
+    await common.create_admin()
+    await common.seed_posts(args.posts)
+
+    params = {
+        "offset": args.offset,
+        "limit": args.page_size,
+        "sort": "created",
+        "order": "desc",
+        "tags": args.tags.split(",") if args.tags else [],
+    }
+
+    async with common.session_local() as db:
+
+        async def two_queries():
+            await baselines.count_posts(db, tags=params["tags"])
+            await baselines.get_posts(db, **params)
+
+        async def one_query():
+            await baselines.get_page_with_count(db, **params)
+
+        before = common.summarize(
+            await common.measure(two_queries, iterations=args.iterations),
+        )
+        after = common.summarize(
+            await common.measure(one_query, iterations=args.iterations),
+        )
+
+    common.report(
+        {
+            "benchmark": "listing_roundtrip",
+            "params": vars(args),
+            "count_then_page": before,
+            "page_with_count": after,
+            "saved_mean_ms": round(before["mean"] - after["mean"], 3),
+        },
+    )
+    await common.engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=5000)
+    parser.add_argument("--page-size", type=int, default=3)
+    parser.add_argument("--offset", type=int, default=0)
+    parser.add_argument("--tags", default="")
+    parser.add_argument("--iterations", type=int, default=300)
+    asyncio.run(main(parser.parse_args()))
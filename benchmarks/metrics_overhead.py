@@ -0,0 +1,111 @@
+"""
+Cost of metrics: per request of the middleware and per SQL statement of
+the engine hooks. Uses a trivial app, so nothing hides the overhead.
+
+    APP_MODE=test python -m benchmarks.metrics_overhead
+"""
+
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import Any, Dict
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.core.metrics import (
+    Metrics,
+    MetricsMiddleware,
+    RequestStats,
+    after_cursor_execute,
+    before_cursor_execute,
+    request_stats,
+)
+from benchmarks import common
+
+
+def make_app(*, instrumented: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping/{value}")
+    async def ping(value: int) -> Dict[str, int]:
+        return {"value": value}
+
+    if instrumented:
+        app.add_middleware(MetricsMiddleware, registry=Metrics())
+    return app
+
+
+async def requests(app: FastAPI, iterations: int) -> Dict[str, Any]:
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        num = iter(range(iterations * 2))
+
+        async def call() -> None:
+            await client.get(f"/ping/{next(num)}")
+
+        return common.summarize(
+            await common.measure(call, iterations=iterations, warmup=100),
+        )
+
+
+def observe(iterations: int) -> float:
+    registry = Metrics()
+    stats = RequestStats(queries=3, db_seconds=0.002)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        registry.observe_request(
+            method="GET",
+            route="/api/v1/post/{post_id}",
+            status=200,
+            seconds=0.004,
+            size=2048,
+            stats=stats,
+        )
+    return (time.perf_counter() - start) / iterations
+
+
+def hooks(iterations: int) -> float:
+    conn = SimpleNamespace(info={})
+    token = request_stats.set(RequestStats())
+    start = time.perf_counter()
+    for _ in range(iterations):
+        before_cursor_execute(conn)
+        after_cursor_execute(conn)
+    elapsed = time.perf_counter() - start
+    request_stats.reset(token)
+    return elapsed / iterations
+
+
+async def main(args: argparse.Namespace) -> None:
+    # Rounds alternate, the best one of each kind filters out noise.
+    plain, instrumented = [], []
+    for _ in range(args.rounds):
+        plain.append(await requests(make_app(instrumented=False), args.iterations))
+        instrumented.append(
+            await requests(make_app(instrumented=True), args.iterations),
+        )
+    best_plain = min(plain, key=lambda result: result["p50"])
+    best_instrumented = min(instrumented, key=lambda result: result["p50"])
+
+    common.report(
+        {
+            "benchmark": "metrics_overhead",
+            "plain": best_plain,
+            "instrumented": best_instrumented,
+            "request_p50_overhead_us": round(
+                (best_instrumented["p50"] - best_plain["p50"]) * 1000,
+                1,
+            ),
+            "observe_request_us": round(observe(args.iterations * 10) * 1e6, 3),
+            "query_hooks_us": round(hooks(args.iterations * 10) * 1e6, 3),
+        },
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=3)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,133 @@
+"""
+Password verification under concurrency: bcrypt inline on the event loop
+vs the bounded hashing pool. Reports wall time of a login burst, how late
+a 5ms timer fires meanwhile, and latency of `/post/` requests made through
+the in-process app during the burst, next to the same requests without
+logins. Cache is off, so the reads go to the database.
+
+    APP_MODE=test python -m benchmarks.password_hashing --concurrency 16
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+from httpx import AsyncClient
+
+from app.core import security
+from app.core.cache import cache
+from benchmarks import common
+
+TICK = 0.005
+
+
+async def loop_lag(stop: asyncio.Event, samples: List[float]) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        samples.append(max(0.0, time.perf_counter() - start - TICK))
+
+
+async def inline_verify(password: str, hashed: str) -> bool:
+    # Behaviour before the pool: CPU bound call right on the loop.
+    return security.pwd_context.verify(password, hashed)
+
+
+async def read_listing(client: AsyncClient) -> None:
+    response = await client.get("/post/")
+    if response.status_code != 200:
+        raise RuntimeError(f"/post/: {response.status_code}")
+
+
+async def reader(
+    client: AsyncClient,
+    stop: asyncio.Event,
+    samples: List[float],
+) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await read_listing(client)
+        samples.append(time.perf_counter() - start)
+
+
+async def burst(
+    verify: Callable[[str, str], Awaitable[bool]],
+    *,
+    client: AsyncClient,
+    concurrency: int,
+    readers: int,
+    hashed: str,
+) -> Dict[str, Any]:
+    stop = asyncio.Event()
+    lag: List[float] = []
+    reads: List[float] = []
+    monitor = asyncio.create_task(loop_lag(stop, lag))
+    reading = [asyncio.create_task(reader(client, stop, reads)) for _ in range(readers)]
+    await asyncio.sleep(TICK * 2)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(verify("password", hashed) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await asyncio.gather(monitor, *reading)
+    return {
+        "wall_ms": round(elapsed * 1000, 3),
+        "logins_per_second": round(concurrency / elapsed, 2),
+        "loop_lag": common.summarize(lag or [0.0]),
+        "listing": common.summarize(reads),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    cache.enabled = False
+    await common.reset_db()
+    await common.create_admin()
+    await common.seed_posts(args.posts, content_size=2000)
+
+    hashed = security.pwd_context.hash("password")
+    pool = security.hashing_pool
+
+    async with common.app_client() as client:
+        idle = common.summarize(
+            await common.measure(
+                lambda: read_listing(client),
+                iterations=args.iterations,
+            ),
+        )
+        results = {
+            name: await burst(
+                verify,
+                client=client,
+                concurrency=args.concurrency,
+                readers=args.readers,
+                hashed=hashed,
+            )
+            for name, verify in (
+                ("inline", inline_verify),
+                ("pool", security.verify_password),
+            )
+        }
+
+    common.report(
+        {
+            "benchmark": "password_hashing",
+            "concurrency": args.concurrency,
+            "readers": args.readers,
+            "workers": pool.workers,
+            "listing_without_logins": idle,
+            **results,
+            "pool_stats": pool.info(),
+        },
+    )
+    await common.engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--readers", type=int, default=2)
+    parser.add_argument("--posts", type=int, default=500)
+    parser.add_argument("--iterations", type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
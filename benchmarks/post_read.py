@@ -0,0 +1,64 @@
+"""
+Post page built from the row, validated against `PostResponse` and encoded
+on every read, vs JSON rendered on write and served as is. Cache is off.
+
+    APP_MODE=test python -m benchmarks.post_read --posts 2000
+"""
+
+import argparse
+import asyncio
+import random
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app import crud, schemas
+from app.core.cache import cache
+from benchmarks import baselines, common
+from benchmarks.listing_json import timed
+
+post_adapter = TypeAdapter(schemas.PostResponse)
+
+
+async def main(args: argparse.Namespace) -> None:
+    cache.enabled = False
+    await common.reset_db()
+    await common.create_admin()
+    await common.seed_posts(args.posts, content_size=args.content_size)
+    post_ids = await common.sample_post_ids()
+
+    async with common.session_local() as db:
+
+        async def models() -> None:
+            post = await baselines.get_post(db, post_id=random.choice(post_ids))
+            JSONResponse(
+                post_adapter.dump_python(
+                    post_adapter.validate_python(post),
+                    mode="json",
+                ),
+            )
+
+        async def rendered() -> None:
+            await crud.post.get_rendered_post(db, post_id=random.choice(post_ids))
+
+        before = await timed(models, args.iterations)
+        after = await timed(rendered, args.iterations)
+
+    common.report(
+        {
+            "benchmark": "post_read",
+            "params": vars(args),
+            "models": before,
+            "rendered": after,
+            "saved_mean_ms": round(before["mean"] - after["mean"], 3),
+        },
+    )
+    await common.engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=2000)
+    parser.add_argument("--content-size", type=int, default=8000)
+    parser.add_argument("--iterations", type=int, default=500)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,121 @@
+"""
+Latency of post writes through the API, along with SQL statements and
+commits each of them takes.
+
+    APP_MODE=test python -m benchmarks.post_writes --requests 500
+"""
+
+import argparse
+import asyncio
+import itertools
+from typing import Any, Awaitable, Callable, Dict, List
+
+from httpx import AsyncClient
+from sqlalchemy import event
+
+from app.db.session import engine
+from benchmarks import common
+
+ADMIN_PASSWORD = "bench-admin"
+
+
+class StatementCounter:
+    def __init__(self) -> None:
+        self.statements = 0
+        self.commits = 0
+
+    def before_cursor_execute(self, *args: Any) -> None:
+        self.statements += 1
+
+    def commit(self, *args: Any) -> None:
+        self.commits += 1
+
+
+async def run(
+    func: Callable[[], Awaitable[Any]],
+    args: argparse.Namespace,
+) -> Dict[str, Any]:
+    counter = StatementCounter()
+    target = engine.sync_engine
+    event.listen(target, "before_cursor_execute", counter.before_cursor_execute)
+    event.listen(target, "commit", counter.commit)
+    try:
+        latency = common.summarize(
+            await common.measure(func, iterations=args.requests, warmup=0),
+        )
+    finally:
+        event.remove(target, "before_cursor_execute", counter.before_cursor_execute)
+        event.remove(target, "commit", counter.commit)
+
+    elapsed, _ = await common.run_concurrently(
+        func,
+        requests=args.requests,
+        concurrency=args.concurrency,
+    )
+    return {
+        **latency,
+        "throughput": round(args.requests / elapsed, 2),
+        "statements_per_write": round(counter.statements / args.requests, 2),
+        "commits_per_write": round(counter.commits / args.requests, 2),
+    }
+
+
+def writes(client: AsyncClient, auth: Dict[str, str]) -> Dict[str, Callable]:
+    numbers = itertools.count()
+    created: List[str] = []
+
+    def body() -> Dict[str, Any]:
+        post = common.make_post(next(numbers), content_size=2000)
+        # Titles make post_id, they have to be unique.
+        post.title = f"{post.title} {next(numbers)}"
+        return post.model_dump(
+            include={"title", "description", "content", "tags", "estimated"},
+        )
+
+    async def create() -> None:
+        response = await client.post("/post/", json=body(), headers=auth)
+        assert response.status_code == 200, response.text
+        created.append(response.json()["post_id"])
+
+    async def update() -> None:
+        post_id = created[next(numbers) % len(created)]
+        response = await client.put(f"/post/{post_id}", json=body(), headers=auth)
+        assert response.status_code == 200, response.text
+
+    return {"create": create, "update": update}
+
+
+async def main(args: argparse.Namespace) -> None:
+    await common.reset_db()
+    await common.create_admin(ADMIN_PASSWORD)
+    await common.seed_posts(args.posts, content_size=2000)
+
+    results = {}
+    async with common.app_client() as client:
+        response = await client.post(
+            "/auth/login",
+            data={"username": "bench-admin@foobar.baz", "password": ADMIN_PASSWORD},
+        )
+        auth = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        for name, func in writes(client, auth).items():
+            results[name] = await run(func, args)
+
+    common.report(
+        {
+            "benchmark": "post_writes",
+            "config": {
+                "posts": args.posts,
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+            },
+            "results": results,
+        },
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,89 @@
+"""
+Response step of read endpoints, after CRUD has returned. Compares the
+old path, response model validation plus stdlib JSONResponse, with the same
+validation encoded by orjson, and with a pre-validated model serialized by
+`model_response`. No DB in the timed part, so the numbers are CPU only.
+
+    APP_MODE=test python -m benchmarks.response_render --posts 2000
+"""
+
+import argparse
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+
+from app import crud, schemas
+from app.api.responses import model_response
+from benchmarks import common
+from benchmarks.listing_json import timed
+
+
+def paths(schema: Any, content: Any) -> Dict[str, Callable[[], Awaitable[None]]]:
+    adapter = TypeAdapter(schema)
+
+    # Same validation and serialization FastAPI does for response_model.
+    def validated() -> Any:
+        return adapter.dump_python(adapter.validate_python(content), mode="json")
+
+    async def stdlib() -> None:
+        JSONResponse(validated())
+
+    async def orjson() -> None:
+        ORJSONResponse(validated())
+
+    async def prevalidated() -> None:
+        model_response(schema, content)
+
+    return {"stdlib": stdlib, "orjson": orjson, "prevalidated": prevalidated}
+
+
+async def main(args: argparse.Namespace) -> None:
+    await common.reset_db()
+    await common.create_admin()
+    await common.seed_posts(args.posts, content_size=2000)
+
+    async with common.session_local() as db:
+        user = await crud.user.get_user(db, email="bench-admin@foobar.baz")
+        tags = await crud.tag.get_all_tags(db)
+        posts, _ = await crud.post.get_posts_by_cursor(db, limit=args.page_size)
+
+    page = schemas.CursorPageResponse.model_construct(
+        page_size=args.page_size,
+        filter_tags=[],
+        next_cursor="cursor",
+        prev_cursor=None,
+        data=posts,
+    )
+    cases: Dict[str, Any] = {
+        "user_me": (schemas.UserResponse, user),
+        "tags": (schemas.TagsResponse, tags),
+        "listing_cursor": (schemas.CursorPageResponse, page),
+    }
+
+    results: Dict[str, Any] = {}
+    for name, (schema, content) in cases.items():
+        result: Dict[str, Any] = {}
+        for path, func in paths(schema, content).items():
+            result[path] = await timed(func, args.iterations)
+        cpu: List[float] = [result[path]["cpu_ms"] for path in result]
+        result["saved_cpu_ms"] = round(cpu[0] - cpu[-1], 3)
+        results[name] = result
+
+    common.report(
+        {
+            "benchmark": "response_render",
+            "params": vars(args),
+            "results": results,
+        },
+    )
+    await common.engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=2000)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=3000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,108 @@
+"""
+Connection hold time per request with sessions released right after the
+endpoint returns vs at dependency teardown, after response serialization.
+
+Cache is off, so every request hits the database. Run with a small pool:
+
+    APP_MODE=test APP_PG_POOL_SIZE=2 APP_PG_POOL_MAX_OVERFLOW=0 \\
+    python -m benchmarks.session_release
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, List
+from unittest import mock
+
+from sqlalchemy import event
+
+from app.api import route
+from app.core.cache import cache
+from app.db.session import engine, pool_status
+from benchmarks import common
+
+
+class HoldTimer:
+    def __init__(self) -> None:
+        self.started: Dict[int, float] = {}
+        self.held: List[float] = []
+
+    def checkout(self, dbapi_conn: Any, record: Any, proxy: Any) -> None:
+        self.started[id(record)] = time.perf_counter()
+
+    def checkin(self, dbapi_conn: Any, record: Any) -> None:
+        start = self.started.pop(id(record), None)
+        if start is not None:
+            self.held.append(time.perf_counter() - start)
+
+
+async def run(args: argparse.Namespace, *, release: bool) -> Dict[str, Any]:
+    timer = HoldTimer()
+    event.listen(engine.sync_engine, "checkout", timer.checkout)
+    event.listen(engine.sync_engine, "checkin", timer.checkin)
+    wait_before = pool_status()["wait_seconds_total"]
+
+    async def noop(values: Dict[str, Any]) -> None:
+        return None
+
+    patch = mock.patch.object(route, "release_sessions", route.release_sessions)
+    if not release:
+        patch = mock.patch.object(route, "release_sessions", noop)
+
+    latencies: List[float] = []
+    async with common.app_client() as client:
+        queue: asyncio.Queue = asyncio.Queue()
+        for _ in range(args.requests):
+            queue.put_nowait(None)
+
+        async def worker() -> None:
+            while not queue.empty():
+                queue.get_nowait()
+                start = time.perf_counter()
+                response = await client.get("/post/", params={"page_size": 100})
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200
+
+        with patch:
+            start = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+            elapsed = time.perf_counter() - start
+
+    event.remove(engine.sync_engine, "checkout", timer.checkout)
+    event.remove(engine.sync_engine, "checkin", timer.checkin)
+    hold_ms = sum(timer.held) / len(timer.held) * 1000 if timer.held else 0.0
+    return {
+        "throughput": round(args.requests / elapsed, 2),
+        "latency": common.summarize(latencies),
+        "connection_hold_ms": round(hold_ms, 3),
+        "requests_per_slot_second": round(1000 / hold_ms, 2) if hold_ms else None,
+        "pool_wait_seconds": round(
+            pool_status()["wait_seconds_total"] - wait_before,
+            3,
+        ),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    cache.enabled = False
+    await common.reset_db()
+    await common.create_admin()
+    await common.seed_posts(args.posts, content_size=500)
+
+    common.report(
+        {
+            "benchmark": "session_release",
+            "pool_size": pool_status()["size"],
+            "concurrency": args.concurrency,
+            "teardown": await run(args, release=False),
+            "released": await run(args, release=True),
+        },
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=16)
+    asyncio.run(main(parser.parse_args()))
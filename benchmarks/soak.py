@@ -0,0 +1,228 @@
+"""
+Mixed read/write load against the real app and Postgres, stepping
+concurrency up to find where throughput stops growing.
+
+    APP_MODE=test python -m benchmarks.soak --max-concurrency 64 \
+        --mix listing=55,post=35,tags=5,login=4,update=1
+
+Every step runs for `--duration` seconds and reports throughput, latency
+overall and per operation, error statuses, DB pool checkout waits and event
+loop lag. The knee is the last step which still gained at least
+`--knee-gain` throughput over the previous one.
+"""
+
+import argparse
+import asyncio
+import platform
+import random
+import time
+from collections import Counter, defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from httpx import AsyncClient
+
+from app.core.config import settings
+from app.db.session import PoolStats, engine, pool_status
+from benchmarks import common
+
+ADMIN_EMAIL = "bench-admin@foobar.baz"
+ADMIN_PASSWORD = "bench-admin"
+
+Operation = Callable[[], Awaitable[int]]
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+def concurrency_steps(maximum: int) -> List[int]:
+    steps = [1]
+    while steps[-1] * 2 <= maximum:
+        steps.append(steps[-1] * 2)
+    if steps[-1] != maximum:
+        steps.append(maximum)
+    return steps
+
+
+def operations(
+    client: AsyncClient,
+    *,
+    post_ids: List[str],
+    token: str,
+    page_size: int,
+) -> Dict[str, Operation]:
+    auth = {"Authorization": f"Bearer {token}"}
+
+    async def listing() -> int:
+        params: Dict[str, Any] = {"page_size": page_size}
+        if random.random() < 0.3:
+            params["tags"] = random.choice(common.TAGS)
+        else:
+            params["page"] = random.randint(1, 5)
+        return (await client.get("/post/", params=params)).status_code
+
+    async def post() -> int:
+        return (await client.get(f"/post/{random.choice(post_ids)}")).status_code
+
+    async def tags() -> int:
+        return (await client.get("/post/tags")).status_code
+
+    async def login() -> int:
+        form = {"username": ADMIN_EMAIL, "password": ADMIN_PASSWORD}
+        return (await client.post("/auth/login", data=form)).status_code
+
+    async def update() -> int:
+        post = common.make_post(random.randint(0, 10**6), content_size=2000)
+        response = await client.put(
+            f"/post/{random.choice(post_ids)}",
+            json=post.model_dump(
+                include={"title", "description", "content", "tags", "estimated"},
+            ),
+            headers=auth,
+        )
+        return response.status_code
+
+    return {
+        "listing": listing,
+        "post": post,
+        "tags": tags,
+        "login": login,
+        "update": update,
+    }
+
+
+async def run_step(
+    ops: Dict[str, Operation],
+    mix: Dict[str, float],
+    *,
+    concurrency: int,
+    duration: float,
+) -> Dict[str, Any]:
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    statuses: Counter = Counter()
+
+    async def worker(deadline: float) -> None:
+        while time.perf_counter() < deadline:
+            name = random.choices(names, weights)[0]
+            start = time.perf_counter()
+            status = await ops[name]()
+            latencies[name].append(time.perf_counter() - start)
+            statuses[str(status)] += 1
+
+    # Fresh counters, so waits and max values belong to this step only.
+    engine.sync_engine.pool.stats = PoolStats()  # type: ignore[attr-defined]
+    lag = common.LoopLag()
+    lag.start()
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(start + duration) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    lag_samples = await lag.stop()
+    pool = pool_status()
+
+    every = [sample for samples in latencies.values() for sample in samples]
+    checkouts = pool["checkouts"] or 1
+    return {
+        "concurrency": concurrency,
+        "requests": len(every),
+        "throughput": round(len(every) / elapsed, 2),
+        "latency": common.summarize(every),
+        "operations": {
+            name: common.summarize(samples)
+            for name, samples in sorted(latencies.items())
+        },
+        "statuses": dict(statuses),
+        "pool": {
+            "checkouts": pool["checkouts"],
+            "timeouts": pool["timeouts"],
+            "overflow_max": pool["overflow_max"],
+            "wait_mean_ms": round(pool["wait_seconds_total"] / checkouts * 1000, 3),
+            "wait_max_ms": round(pool["wait_seconds_max"] * 1000, 3),
+        },
+        "loop_lag": common.summarize(lag_samples),
+    }
+
+
+def find_knee(steps: List[Dict[str, Any]], gain: float) -> Optional[int]:
+    """Concurrency after which throughput grows by less than `gain`."""
+    for previous, current in zip(steps, steps[1:]):
+        if current["throughput"] < previous["throughput"] * (1 + gain):
+            return previous["concurrency"]
+    return None
+
+
+async def main(args: argparse.Namespace) -> None:
+    mix = parse_mix(args.mix)
+    if not args.skip_seed:
+        await common.reset_db()
+        await common.create_admin(ADMIN_PASSWORD)
+        await common.seed_posts(args.posts, content_size=args.content_size)
+    post_ids = await common.sample_post_ids()
+
+    steps = []
+    async with common.app_client() as client:
+        response = await client.post(
+            "/auth/login",
+            data={"username": ADMIN_EMAIL, "password": ADMIN_PASSWORD},
+        )
+        response.raise_for_status()
+        ops = operations(
+            client,
+            post_ids=post_ids,
+            token=response.json()["access_token"],
+            page_size=args.page_size,
+        )
+        unknown = set(mix) - set(ops)
+        if unknown:
+            raise SystemExit(f"Unknown operations in mix: {', '.join(unknown)}")
+
+        for concurrency in concurrency_steps(args.max_concurrency):
+            steps.append(
+                await run_step(
+                    ops,
+                    mix,
+                    concurrency=concurrency,
+                    duration=args.duration,
+                ),
+            )
+
+    common.report(
+        {
+            "benchmark": "soak",
+            "config": {
+                "posts": args.posts,
+                "mix": mix,
+                "duration": args.duration,
+                "page_size": args.page_size,
+                "cache_enabled": settings.CACHE_ENABLED,
+                "pool_size": settings.PG_POOL_SIZE,
+                "pool_max_overflow": settings.PG_POOL_MAX_OVERFLOW,
+                "password_hash_workers": settings.PASSWORD_HASH_WORKERS,
+                "python": platform.python_version(),
+            },
+            "knee_concurrency": find_knee(steps, args.knee_gain),
+            "steps": steps,
+        },
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=20_000)
+    parser.add_argument("--content-size", type=int, default=4000)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument(
+        "--mix",
+        default="listing=55,post=35,tags=5,login=4,update=1",
+        help="Comma separated operation=weight",
+    )
+    parser.add_argument("--max-concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--knee-gain", type=float, default=0.1)
+    parser.add_argument("--skip-seed", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,168 @@
+"""
+Per-endpoint latency, CPU time and throughput of the app driven in-process
+through httpx.ASGITransport, against a seeded corpus. Prints JSON, so runs
+can be saved and compared.
+
+    APP_MODE=test python -m benchmarks.suite --posts 100000 > before.json
+
+Seeding takes a while, `--skip-seed` reuses the corpus of a previous run.
+Cache is on or off as configured, e.g. `APP_CACHE_ENABLED=false`.
+"""
+
+import argparse
+import asyncio
+import platform
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+from httpx import AsyncClient, Response
+
+from app.core.config import settings
+from benchmarks import common
+
+ADMIN_PASSWORD = "bench-admin"
+
+
+def expect(response: Response, status: int = 200) -> None:
+    if response.status_code != status:
+        raise RuntimeError(f"{response.request.url}: {response.status_code}")
+
+
+def scenarios(
+    client: AsyncClient,
+    args: argparse.Namespace,
+    *,
+    post_ids: List[str],
+    token: str,
+) -> Dict[str, Callable[[], Awaitable[None]]]:
+    deep_page = max(1, int(args.posts / args.page_size * 0.9))
+    auth = {"Authorization": f"Bearer {token}"}
+    login_form = {"username": "bench-admin@foobar.baz", "password": ADMIN_PASSWORD}
+
+    async def listing() -> None:
+        expect(await client.get("/post/", params={"page_size": args.page_size}))
+
+    async def listing_filtered() -> None:
+        params = {"page_size": args.page_size, "tags": random.choice(common.TAGS)}
+        expect(await client.get("/post/", params=params))
+
+    async def listing_deep_page() -> None:
+        params = {"page_size": args.page_size, "page": deep_page}
+        expect(await client.get("/post/", params=params))
+
+    async def listing_cursor() -> None:
+        params = {"page_size": args.page_size, "mode": "cursor"}
+        expect(await client.get("/post/", params=params))
+
+    async def post() -> None:
+        expect(await client.get(f"/post/{random.choice(post_ids)}"))
+
+    async def tags() -> None:
+        expect(await client.get("/post/tags"))
+
+    async def login() -> None:
+        expect(await client.post("/auth/login", data=login_form))
+
+    async def user_me() -> None:
+        expect(await client.get("/user/me", headers=auth))
+
+    return {
+        "listing": listing,
+        "listing_filtered": listing_filtered,
+        "listing_deep_page": listing_deep_page,
+        "listing_cursor": listing_cursor,
+        "post": post,
+        "tags": tags,
+        "login": login,
+        "user_me": user_me,
+    }
+
+
+async def run_scenario(
+    func: Callable[[], Awaitable[None]],
+    *,
+    iterations: int,
+    concurrency: int,
+) -> Dict[str, Any]:
+    # Client and app share the process, so CPU time is of both of them,
+    # measured on the sequential run only.
+    warmup = min(10, iterations)
+    cpu = time.process_time()
+    latency = common.summarize(
+        await common.measure(func, iterations=iterations, warmup=warmup),
+    )
+    cpu_per_call = (time.process_time() - cpu) / (iterations + warmup)
+    elapsed, _ = await common.run_concurrently(
+        func,
+        requests=iterations,
+        concurrency=concurrency,
+    )
+    return {
+        **latency,
+        "cpu_ms": round(cpu_per_call * 1000, 3),
+        "throughput": round(iterations / elapsed, 2),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    if not args.skip_seed:
+        await common.reset_db()
+        await common.create_admin(ADMIN_PASSWORD)
+        await common.seed_posts(args.posts, content_size=args.content_size)
+    post_ids = await common.sample_post_ids()
+
+    results: Dict[str, Any] = {}
+    async with common.app_client() as client:
+        response = await client.post(
+            "/auth/login",
+            data={"username": "bench-admin@foobar.baz", "password": ADMIN_PASSWORD},
+        )
+        expect(response)
+        token = response.json()["access_token"]
+
+        selected = args.only.split(",") if args.only else None
+        for name, func in scenarios(
+            client,
+            args,
+            post_ids=post_ids,
+            token=token,
+        ).items():
+            if selected and name not in selected:
+                continue
+            # bcrypt makes logins a hundred times slower than the rest.
+            iterations = args.iterations // 20 if name == "login" else args.iterations
+            results[name] = await run_scenario(
+                func,
+                iterations=max(iterations, 1),
+                concurrency=args.concurrency,
+            )
+
+    common.report(
+        {
+            "benchmark": "suite",
+            "config": {
+                "posts": args.posts,
+                "content_size": args.content_size,
+                "page_size": args.page_size,
+                "iterations": args.iterations,
+                "concurrency": args.concurrency,
+                "cache_enabled": settings.CACHE_ENABLED,
+                "pool_size": settings.PG_POOL_SIZE,
+                "python": platform.python_version(),
+            },
+            "results": results,
+        },
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=100_000)
+    parser.add_argument("--content-size", type=int, default=4000)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--only", help="Comma separated scenario names")
+    parser.add_argument("--skip-seed", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -8,9 +8,11 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import NullPool
 
 from app import crud, schemas
+from app.core.cache import cache, principal_cache
 from app.core.config import get_settings
+from app.core.token_epochs import token_epochs
 from app.db.meta import Base
-from app.db.session import get_db_session
+from app.db.session import get_db_session, get_read_db_session
 from app.main import app as fastapi_app
 from tests import utils
 
@@ -34,6 +36,7 @@ async def override_get_db_session() -> AsyncGenerator[AsyncSession, None]:
 
 
 fastapi_app.dependency_overrides[get_db_session] = override_get_db_session
+fastapi_app.dependency_overrides[get_read_db_session] = override_get_db_session
 
 
 @pytest.fixture
@@ -58,6 +61,9 @@ async def prepare_db():
         )
         await conn.commit()
     await engine.dispose()
+    cache.clear()
+    principal_cache.clear()
+    token_epochs.clear()
 
 
 @pytest.fixture
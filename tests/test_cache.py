@@ -0,0 +1,94 @@
+from unittest import mock
+
+import pytest
+
+from app.core.cache import MISSING, TTLCache, cached
+
+pytestmark = pytest.mark.anyio
+
+
+class TestCache:
+    def test_lru_eviction_by_size(self):
+        store = TTLCache(max_bytes=1000, ttl=60)
+        for num in range(5):
+            store.set(num, "x" * 300)
+
+        assert store.size_bytes <= 1000
+        assert store.get(0) is MISSING
+        assert store.get(4) == "x" * 300
+        assert store.stats.evictions == 2
+
+        # Recently used entry survives the next eviction.
+        store.get(2)
+        store.set(5, "y" * 300)
+        assert store.get(2) == "x" * 300
+        assert store.get(3) is MISSING
+
+        # Value bigger than the whole cache isn't stored at all.
+        store.set("big", "z" * 2000)
+        assert store.get("big") is MISSING
+
+    def test_ttl_and_tags(self):
+        store = TTLCache(max_bytes=10_000, ttl=60)
+        store.set("a", 1, tags=["posts"])
+        store.set("b", 2, tags=["posts", "post:b"])
+        store.set("c", 3, ttl=10)
+
+        store.invalidate("post:b")
+        assert store.get("a") == 1
+        assert store.get("b") is MISSING
+
+        with mock.patch("app.core.cache.time.monotonic", return_value=1e12):
+            assert store.get("c") is MISSING
+        assert store.stats.expirations == 1
+
+        store.invalidate("posts")
+        assert len(store) == 0
+        assert store.size_bytes == 0
+
+    async def test_cached_decorator(self):
+        store = TTLCache(max_bytes=10_000, ttl=60)
+        calls = []
+
+        class CRUD:
+            @cached(store, "items", tags=lambda *, name: [f"item:{name}"])
+            async def get(self, db, *, name: str):
+                calls.append(name)
+                return name.upper()
+
+        crud = CRUD()
+        assert await crud.get(None, name="foo") == "FOO"
+        assert await crud.get(None, name="foo") == "FOO"
+        assert await crud.get(None, name="bar") == "BAR"
+        assert calls == ["foo", "bar"]
+        assert (store.stats.hits, store.stats.misses) == (1, 2)
+
+        store.invalidate("item:foo")
+        await crud.get(None, name="foo")
+        await crud.get(None, name="bar")
+        assert calls == ["foo", "bar", "foo"]
+
+    async def test_invalidated_while_reading(self):
+        store = TTLCache(max_bytes=10_000, ttl=60)
+        version = {"foo": 1}
+
+        class CRUD:
+            @cached(store, "items", tags=lambda *, name: [f"item:{name}"])
+            async def get(self, db, *, name: str):
+                value = version[name]
+                # Write commits and invalidates while this read is in flight.
+                if db == "racing":
+                    version[name] += 1
+                    store.invalidate(f"item:{name}")
+                return value
+
+        crud = CRUD()
+        assert await crud.get("racing", name="foo") == 1
+        assert len(store) == 0
+
+        assert await crud.get(None, name="foo") == 2
+        assert await crud.get(None, name="foo") == 2
+        assert len(store) == 1
+
+        store.clear()
+        assert await crud.get(None, name="foo") == 2
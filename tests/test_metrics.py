@@ -0,0 +1,99 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from pydantic import SecretStr
+
+from app.core import config
+from app.core.config import settings
+from app.core.metrics import HistogramFamily, Metrics, RequestStats, instrument_engine
+from tests import conftest
+
+pytestmark = pytest.mark.anyio
+
+
+class TestMetrics:
+    def test_histogram_render(self):
+        family = HistogramFamily(
+            "latency",
+            "Latency.",
+            labels=("route",),
+            buckets=(0.1, 1),
+        )
+        for value in [0.05, 0.5, 5]:
+            family.observe(("/post/",), value)
+
+        lines = family.render()
+        assert 'latency_bucket{route="/post/",le="0.1"} 1' in lines
+        assert 'latency_bucket{route="/post/",le="1"} 2' in lines
+        assert 'latency_bucket{route="/post/",le="+Inf"} 3' in lines
+        assert 'latency_count{route="/post/"} 3' in lines
+
+    def test_collectors_render_numbers_only(self):
+        registry = Metrics()
+        registry.collect("pool", lambda: {"size": 5, "url": "postgresql://"})
+        registry.collect("db_pool", lambda: {"size": 5}, pool="primary")
+        registry.collect("db_pool", lambda: {"size": 2}, pool="replica0")
+        registry.observe_request(
+            method="GET",
+            route="/post/",
+            status=200,
+            seconds=0.01,
+            size=100,
+            stats=RequestStats(queries=2, db_seconds=0.005),
+        )
+
+        text = registry.render()
+        assert "app_pool_size 5.0" in text
+        assert "app_pool_url" not in text
+        assert text.count("# TYPE app_db_pool_size gauge") == 1
+        assert 'app_db_pool_size{pool="primary"} 5.0' in text
+        assert 'app_db_pool_size{pool="replica0"} 2.0' in text
+        labels = 'method="GET",route="/post/",status="200"'
+        assert f"http_responses_total{{{labels}}} 1" in text
+
+    async def test_metrics_endpoint(self, client: AsyncClient, create_admin: None):
+        # Test sessions come from own engine, instrument it like the app one.
+        instrument_engine(conftest.engine)
+
+        request = await client.get("/post/tags")
+        assert request.status_code == status.HTTP_200_OK
+        request = await client.get("/no/such/route")
+        assert request.status_code == status.HTTP_404_NOT_FOUND
+
+        request = await client.get(f"{conftest.settings.SERVER_HOST}/metrics")
+        assert request.status_code == status.HTTP_200_OK
+        assert request.headers["content-type"].startswith("text/plain")
+
+        labels = f'method="GET",route="{conftest.settings.API_URL}/post/tags"'
+        lines = request.text.splitlines()
+        assert any(
+            line.startswith(f'http_responses_total{{{labels},status="200"}}')
+            for line in lines
+        )
+        assert 'route="unmatched",status="404"' in request.text
+        queries = next(
+            line
+            for line in lines
+            if line.startswith(f"db_queries_per_request_sum{{{labels}}}")
+        )
+        assert float(queries.split()[-1]) >= 1
+        assert "app_db_pool_checked_out" in request.text
+
+    async def test_metrics_token(
+        self,
+        client: AsyncClient,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        monkeypatch.setattr(settings, "METRICS_TOKEN", SecretStr("scrape-me"))
+        url = f"{conftest.settings.SERVER_HOST}/metrics"
+
+        for headers in ({}, {"Authorization": "Bearer wrong"}):
+            request = await client.get(url, headers=headers)
+            assert request.status_code == status.HTTP_401_UNAUTHORIZED
+            assert "http_responses_total" not in request.text
+
+        request = await client.get(url, headers={"Authorization": "Bearer scrape-me"})
+        assert request.status_code == status.HTTP_200_OK
+
+    def test_off_in_production(self):
+        assert not config.Production().METRICS_ENABLED
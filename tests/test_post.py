@@ -1,8 +1,15 @@
+import json
+
 import pytest
 from fastapi import status
 from httpx import AsyncClient
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app import schemas
+from app import crud, schemas
+from app.core.config import settings
+from app.crud import crud_post
+from app.models import Account, Post
 from tests import utils
 
 pytestmark = pytest.mark.anyio
@@ -104,6 +111,7 @@ class TestPost:
         post_modif = post_orig.model_copy()
         post_modif.title = post_orig.title + " modified"
         post_modif.content = post_orig.content + " modified"  # pyright: ignore
+        post_modif.tags = [*post_orig.tags, "test-updated"]
 
         post_new_data = schemas.UpdatePostRequest(**post_modif.model_dump())
 
@@ -115,11 +123,399 @@ class TestPost:
         assert request.status_code == status.HTTP_200_OK
         response = schemas.UpdatePostResponse(**request.json())
         assert post_id == response.post_id
+        etag = request.headers["ETag"]
 
         post_latest = await self.api_get_post(manager, post_id)
         assert post_latest != post_orig
+        assert (await manager.get(post_id)).headers["ETag"] == etag
+
+        request = await client.get("/post/tags")
+        assert "test-updated" in request.json()["tags"]
+
+        request = await manager.update("missing000", post_new_data)
+        assert request.status_code == status.HTTP_404_NOT_FOUND
 
         excluded = {"modified"}
         assert post_modif.model_dump(exclude=excluded) == post_latest.model_dump(
             exclude=excluded,
         )
+
+        # Null tags mean no tags, the post keeps serving a list.
+        body = {**post_new_data.model_dump(), "tags": None}
+        request = await client.put(
+            f"/post/{post_id}",
+            json=body,
+            headers=admin_auth_header,
+        )
+        assert request.status_code == status.HTTP_200_OK
+        assert (await manager.get(post_id)).json()["tags"] == []
+
+    async def test_cursor_pagination(
+        self,
+        client: AsyncClient,
+        admin_auth_header: dict,
+    ):
+        manager = utils.ManagePost(client=client)
+        manager.set_headers(admin_auth_header)
+
+        post_ids = []
+        for post_num in range(1, 6):
+            post = self.create_post_template(f"cursor{post_num}")
+            post_ids.append(await self.api_create_post(manager, post))
+
+        manager.set_headers()
+
+        # Walk forward until there is no next cursor.
+        seen, pages = [], []
+        params = {"mode": "cursor", "page_size": 2}
+        while True:
+            request = await manager.list(**params)
+            assert request.status_code == status.HTTP_200_OK
+            page = schemas.CursorPageResponse(**request.json())
+            pages.append(page)
+            seen.extend(post.post_id for post in page.data)
+            if not page.next_cursor:
+                break
+            params = {"cursor": page.next_cursor, "page_size": 2}
+
+        assert seen == post_ids
+        assert [len(page.data) for page in pages] == [2, 2, 1]
+        assert pages[0].prev_cursor is None
+
+        # And back again from the last page.
+        request = await manager.list(cursor=pages[-1].prev_cursor, page_size=2)
+        assert request.status_code == status.HTTP_200_OK
+        page = schemas.CursorPageResponse(**request.json())
+        assert page.data == pages[1].data
+        assert page.next_cursor and page.prev_cursor
+
+        request = await manager.list(cursor="not-a-cursor")
+        assert request.status_code == status.HTTP_400_BAD_REQUEST
+
+        oversized = schemas.PostCursor.model_construct(
+            created=page.data[0].created,
+            id=99999999999999999999,
+        )
+        request = await manager.list(cursor=oversized.encode())
+        assert request.status_code == status.HTTP_400_BAD_REQUEST
+
+        # Cursor keeps order and filter of its listing.
+        params = {"mode": "cursor", "page_size": 2, "order": "desc", "tags": "test"}
+        request = await manager.list(**params)
+        next_cursor = request.json()["next_cursor"]
+        request = await manager.list(cursor=next_cursor, page_size=2)
+        assert request.status_code == status.HTTP_200_OK
+        page = schemas.CursorPageResponse(**request.json())
+        assert [post.post_id for post in page.data] == post_ids[2:0:-1]
+        assert page.filter_tags == ["test"]
+
+        for mismatch in ({"order": "asc"}, {"tags": "test,other"}, {"tags": ""}):
+            request = await manager.list(cursor=next_cursor, **mismatch)
+            assert request.status_code == status.HTTP_400_BAD_REQUEST
+
+        request = await manager.list(cursor=next_cursor, order="desc", tags="test")
+        assert request.status_code == status.HTTP_200_OK
+
+        # Page number mode stays as it was.
+        request = await manager.list(page=3, page_size=2)
+        assert request.status_code == status.HTTP_200_OK
+        page_response = schemas.PageResponse(**request.json())
+        assert page_response.total_records == len(post_ids)
+        assert len(page_response.data) == 1
+
+    async def test_tags_filter_uses_index(
+        self,
+        prepare_db: None,
+        db_session: AsyncSession,
+        create_post_crud: str,
+    ):
+        # Table is tiny, so make any index path cheaper than a seq scan.
+        await db_session.execute(text("SET enable_seqscan = off"))
+
+        count_stmt = select(func.count()).select_from(Post)
+        plan = await utils.explain(
+            db_session,
+            count_stmt.filter(crud.post.tags_filter(["test"])),
+        )
+        assert "ix_post_tags" in plan
+
+        count, content = await crud.post.get_page_json(
+            db_session,
+            page=1,
+            page_size=3,
+            sort="created",
+            tags=["test"],
+        )
+        assert count == 1
+        assert json.loads(content)["data"][0]["post_id"] == create_post_crud
+
+    async def test_page_rendered_by_db(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        create_post_crud: str,
+    ):
+        post = self.create_post_template("second")
+        await crud.post.create_post(
+            db_session,
+            user_id=1,
+            obj_in=schemas.CreatePostInDB(**post.model_dump()),
+        )
+
+        for params in ({}, {"order": "desc", "tags": "test"}, {"page": 2}):
+            request = await utils.ManagePost(client=client).list(
+                page_size=1,
+                **params,
+            )
+            assert request.status_code == status.HTTP_200_OK
+            assert request.headers["ETag"]
+
+            # Same rows made into models by the keyset listing.
+            page = params.get("page", 1)
+            tags = [params["tags"]] if "tags" in params else []
+            posts, _ = await crud.post.get_posts_by_cursor(
+                db_session,
+                limit=page,
+                order=params.get("order"),
+                tags=tags,
+            )
+            expected = schemas.PageResponse(
+                current_page=page,
+                total_pages=2,
+                page_size=1,
+                total_records=2,
+                filter_tags=tags,
+                data=[schemas.PostResponse(**posts[page - 1].model_dump())],
+            )
+            assert request.json() == expected.model_dump(mode="json")
+
+        request = await utils.ManagePost(client=client).list(page=3, page_size=1)
+        assert request.status_code == status.HTTP_400_BAD_REQUEST
+
+    async def test_rendered_post(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        admin_auth_header: dict,
+        admin_data: schemas.UserToDB,
+        create_post_crud: str,
+    ):
+        post_id = create_post_crud
+        manager = utils.ManagePost(client=client)
+
+        async def expected() -> dict:
+            # Post made of its row, the way it was done before rendering.
+            stmt = (
+                select(Post, Account.fullname)
+                .join(Account)
+                .filter(Post.post_id == post_id)
+                .execution_options(populate_existing=True)
+            )
+            post, writer = (await db_session.execute(stmt)).one()
+            response = schemas.PostResponse(
+                **post.post_json,
+                post_id=post.post_id,
+                writer=writer,
+                title=post.title,
+                description=post.description,
+                content=post.content,
+                created=post.created,
+                modified=post.modified,
+            )
+            return response.model_dump(mode="json")
+
+        request = await manager.get(post_id)
+        assert request.headers["content-type"] == "application/json"
+        assert request.json() == await expected()
+
+        post = schemas.UpdatePostRequest(**request.json())
+        post.tags = ["test", "test-rendered"]
+        post.estimated += 1
+        manager.set_headers(admin_auth_header)
+        await manager.update(post_id, post)
+        request = await manager.get(post_id)
+        assert request.json()["tags"] == ["test", "test-rendered"]
+        assert request.json() == await expected()
+
+        # Posts of renamed writer are rendered again.
+        etag = request.headers["ETag"]
+        admin = await crud.user.get_user(db_session, email=admin_data.email)
+        assert admin
+        await crud.user.update_user(
+            db_session,
+            db_obj=admin,
+            obj_in=admin_data.model_copy(update={"fullname": "test-renamed"}),
+        )
+        request = await manager.get(post_id)
+        assert request.json()["writer"] == "test-renamed"
+        assert request.headers["ETag"] != etag
+
+    async def test_conditional_get(
+        self,
+        client: AsyncClient,
+        admin_auth_header: dict,
+        create_post_crud: str,
+    ):
+        post_id = create_post_crud
+        manager = utils.ManagePost(client=client)
+
+        request = await manager.get(post_id)
+        assert request.status_code == status.HTTP_200_OK
+        etag = request.headers["ETag"]
+
+        manager.set_headers({"If-None-Match": etag})
+        request = await manager.get(post_id)
+        assert request.status_code == status.HTTP_304_NOT_MODIFIED
+        assert request.headers["ETag"] == etag
+        assert not request.content
+
+        request = await manager.list()
+        assert request.status_code == status.HTTP_200_OK
+        list_etag = request.headers["ETag"]
+        assert list_etag.startswith("W/")
+
+        manager.set_headers({"If-None-Match": list_etag})
+        request = await manager.list()
+        assert request.status_code == status.HTTP_304_NOT_MODIFIED
+
+        # Other filters make other listing.
+        request = await manager.list(tags="test")
+        assert request.status_code == status.HTTP_200_OK
+
+        post = schemas.UpdatePostRequest(
+            **(await self.api_get_post(manager, post_id)).model_dump(),
+        )
+        manager.set_headers(admin_auth_header)
+        request = await manager.update(post_id, post)
+        assert request.status_code == status.HTTP_200_OK
+
+        manager.set_headers({"If-None-Match": etag})
+        request = await manager.get(post_id)
+        assert request.status_code == status.HTTP_200_OK
+        assert request.headers["ETag"] != etag
+
+        manager.set_headers({"If-None-Match": list_etag})
+        request = await manager.list()
+        assert request.status_code == status.HTTP_200_OK
+
+    async def test_import_export(
+        self,
+        client: AsyncClient,
+        admin_auth_header: dict,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        # Several COPY batches within one import.
+        monkeypatch.setattr(settings, "POST_IMPORT_BATCH_SIZE", 2)
+        posts = [
+            schemas.ImportPostRequest(
+                **self.create_post_template(f"import-{num}").model_dump(),
+                created=f"2023-01-0{num + 1} 10:00:00",
+            )
+            for num in range(5)
+        ]
+        posts[0].post_id = "imported01"
+        posts[0].modified = "2023-02-01 10:00:00"
+        body = "\n".join(post.model_dump_json() for post in posts)
+
+        request = await client.post("/post/import", content=body)
+        assert request.status_code == status.HTTP_401_UNAUTHORIZED
+
+        request = await client.post(
+            "/post/import",
+            content=body,
+            headers=admin_auth_header,
+        )
+        assert request.status_code == status.HTTP_200_OK
+        assert request.json() == {"imported": 5, "skipped": 0}
+
+        # Already imported posts are skipped.
+        request = await client.post(
+            "/post/import",
+            content=body,
+            headers=admin_auth_header,
+        )
+        assert request.json() == {"imported": 0, "skipped": 5}
+
+        request = await client.post(
+            "/post/import",
+            content=body + "\n{not json",
+            headers=admin_auth_header,
+        )
+        assert request.status_code == status.HTTP_400_BAD_REQUEST
+
+        request = await client.get("/post/tags")
+        assert set(request.json()["tags"]) >= {"test", "test-import-4"}
+
+        post = await self.api_get_post(utils.ManagePost(client=client), "imported01")
+        assert post.title == posts[0].title
+        assert post.modified and post.modified.month == 2
+
+        request = await client.get("/post/export", headers=admin_auth_header)
+        assert request.status_code == status.HTTP_200_OK
+        assert request.headers["content-type"] == "application/x-ndjson"
+        exported = [
+            schemas.ImportPostRequest.model_validate_json(line)
+            for line in request.text.splitlines()
+        ]
+        assert [post.model_dump(exclude={"post_id"}) for post in exported] == [
+            post.model_dump(exclude={"post_id"}) for post in posts
+        ]
+        assert exported[0].post_id == "imported01"
+
+    async def test_dates_round_trip(
+        self,
+        client: AsyncClient,
+        admin_auth_header: dict,
+    ):
+        post = schemas.ImportPostRequest(
+            **self.create_post_template("dates").model_dump(),
+            post_id="dated00001",
+            created="2023-01-02 10:00:00",
+            modified="2023-02-01 11:30:00",
+        )
+        request = await client.post(
+            "/post/import",
+            content=post.model_dump_json(),
+            headers=admin_auth_header,
+        )
+        assert request.json() == {"imported": 1, "skipped": 0}
+
+        # Every read path gives UTC dates without offset.
+        dates = {"created": "2023-01-02T10:00:00", "modified": "2023-02-01T11:30:00"}
+        request = await client.get("/post/dated00001")
+        assert dates.items() <= request.json().items()
+        for params in ({}, {"mode": "cursor"}):
+            request = await client.get("/post/", params=params)
+            assert dates.items() <= request.json()["data"][0].items()
+
+        request = await client.get("/post/export", headers=admin_auth_header)
+        exported = schemas.ImportPostRequest.model_validate_json(request.text)
+        assert (exported.created, exported.modified) == (post.created, post.modified)
+
+    async def test_listing_excerpt(
+        self,
+        client: AsyncClient,
+        admin_auth_header: dict,
+    ):
+        manager = utils.ManagePost(client=client)
+        manager.set_headers(admin_auth_header)
+        post = self.create_post_template("excerpt")
+        post.description = "d" * 300
+        post_id = await self.api_create_post(manager, post)
+
+        # Listings carry the excerpt of the description and no content.
+        for params in ({}, {"mode": "cursor"}):
+            request = await client.get("/post/", params=params)
+            listed = request.json()["data"][0]
+            assert listed["description"] == "d" * crud_post.EXCERPT_LENGTH
+            assert listed["content"] is None
+
+        full = await self.api_get_post(manager, post_id)
+        assert (full.description, full.content) == (post.description, post.content)
+
+        # Update cuts the excerpt of the new description.
+        post.description = "u" * 300
+        await manager.update(post_id, schemas.UpdatePostRequest(**post.model_dump()))
+        request = await client.get("/post/")
+        listed = request.json()["data"][0]
+        assert listed["description"] == "u" * crud_post.EXCERPT_LENGTH
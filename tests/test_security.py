@@ -0,0 +1,55 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core import exceptions
+from app.core.security import HashingPool
+
+pytestmark = pytest.mark.anyio
+
+
+class TestHashingPool:
+    async def test_runs_off_event_loop(self):
+        pool = HashingPool(workers=2, max_queue=4)
+        loop_thread = threading.get_ident()
+
+        thread = await pool.run(threading.get_ident)
+        assert thread != loop_thread
+
+        info = pool.info()
+        assert info["completed"] == 1
+        assert info["queued"] == info["running"] == 0
+
+    async def test_rejects_when_queue_is_full(self):
+        pool = HashingPool(workers=1, max_queue=0)
+
+        with pytest.raises(exceptions.ServiceBusy):
+            await pool.run(threading.get_ident)
+        assert pool.info()["rejected"] == 1
+
+    async def test_cancelled_calls_free_queue(self):
+        pool = HashingPool(workers=1, max_queue=2)
+        started, release = threading.Event(), threading.Event()
+
+        def block() -> None:
+            started.set()
+            release.wait(5)
+
+        blocker = asyncio.create_task(pool.run(block))
+        await asyncio.to_thread(started.wait, 5)
+
+        # Both wait for the busy worker and are cancelled while queued.
+        waiting = [asyncio.create_task(pool.run(threading.get_ident)) for _ in "ab"]
+        await asyncio.sleep(0)
+        assert pool.info()["queued"] == 2
+        for task in waiting:
+            task.cancel()
+        await asyncio.gather(*waiting, return_exceptions=True)
+        assert pool.info()["queued"] == 0
+
+        release.set()
+        await blocker
+        assert await pool.run(threading.get_ident)
+        info = pool.info()
+        assert (info["queued"], info["completed"], info["rejected"]) == (0, 2, 0)
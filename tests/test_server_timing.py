@@ -0,0 +1,74 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from starlette.responses import PlainTextResponse
+
+from app import schemas
+from app.core.server_timing import ServerTimingMiddleware, time_queries
+from tests import conftest, utils
+
+pytestmark = pytest.mark.anyio
+
+
+def segments(header: str) -> dict:
+    result = {}
+    for item in header.split(", "):
+        name, duration = item.split(";dur=")
+        result[name] = float(duration)
+    return result
+
+
+class TestServerTiming:
+    async def test_segments(
+        self,
+        client: AsyncClient,
+        admin_auth_header: dict,
+        create_post_crud: str,
+    ):
+        # Test sessions come from own engine, time it like the app one.
+        time_queries(conftest.engine)
+        manager = utils.ManagePost(client=client)
+
+        request = await manager.get(create_post_crud)
+        assert request.status_code == status.HTTP_200_OK
+        timing = segments(request.headers["Server-Timing"])
+        assert {"db", "app"} <= timing.keys()
+        # Post is stored rendered, nothing is validated or encoded.
+        assert not {"auth", "validation", "json"} & timing.keys()
+        assert timing["app"] >= timing["db"]
+
+        # Returned dict is validated against the response model.
+        manager.set_headers(admin_auth_header)
+        body = schemas.UpdatePostRequest(
+            title="Timed post",
+            description="Timed description",
+            content="Timed content",
+            tags=["timed"],
+            estimated=1,
+        )
+        request = await manager.update(create_post_crud, body)
+        assert request.status_code == status.HTTP_200_OK
+        timing = segments(request.headers["Server-Timing"])
+        assert {"auth", "validation", "json"} <= timing.keys()
+
+        # User comes valid from CRUD and is only serialized.
+        manager = utils.ManageUser(client=client)
+        manager.set_headers(admin_auth_header)
+        request = await manager.get("me")
+        timing = segments(request.headers["Server-Timing"])
+        assert {"auth", "json"} <= timing.keys()
+        assert "validation" not in timing
+
+    @pytest.mark.parametrize("sample,expected", [(0, False), (1, True)])
+    async def test_sampling(self, sample: float, expected: bool):
+        sent = []
+
+        async def receive():
+            return {"type": "http.request", "body": b""}
+
+        async def send(message):
+            sent.append(message)
+
+        middleware = ServerTimingMiddleware(PlainTextResponse("ok"), sample=sample)
+        await middleware({"type": "http", "headers": []}, receive, send)
+        assert (b"server-timing" in dict(sent[0]["headers"])) is expected
@@ -0,0 +1,127 @@
+import time
+
+import anyio
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from starlette.responses import StreamingResponse
+
+from app.api.route import SessionReleaseRoute
+from app.core import config
+from app.db.replicas import ReplicaRouter
+from app.db.session import InstrumentedQueuePool
+from tests.conftest import pg_uri
+
+pytestmark = pytest.mark.anyio
+
+
+class TestPoolTelemetry:
+    async def test_checkout_wait_is_recorded(self):
+        engine = create_async_engine(
+            pg_uri,
+            poolclass=InstrumentedQueuePool,
+            pool_size=1,
+            max_overflow=1,
+        )
+        pool = engine.sync_engine.pool
+
+        async def hold(seconds: float):
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT pg_sleep(:s)"), {"s": seconds})
+
+        try:
+            async with anyio.create_task_group() as tg:
+                for _ in range(3):
+                    tg.start_soon(hold, 0.2)
+
+                await anyio.sleep(0.1)
+                info = pool.info()
+                assert info["checked_out"] == 2
+                assert info["overflow"] == 1
+        finally:
+            await engine.dispose()
+
+        # Third checkout waited for one of the first two.
+        assert pool.stats.checkouts == 3
+        assert pool.stats.overflow_max == 1
+        assert pool.stats.wait_seconds_max >= 0.05
+
+
+class TestReplicaRouter:
+    async def test_selection_and_eviction(self):
+        engines = [create_async_engine(pg_uri) for _ in range(2)]
+        router = ReplicaRouter(
+            engines,
+            selection="round_robin",
+            read_your_writes=60,
+            max_lag=1,
+            check_interval=60,
+        )
+        try:
+            # Unchecked replicas are not used, the first pick starts a check.
+            assert router.pick() is None
+            await router._check_task
+
+            # Test database is a primary, so both "replicas" have no lag.
+            assert [replica.lag for replica in router.replicas] == [0, 0]
+
+            first, second = router.replicas
+            assert [router.pick() for _ in range(3)] == [first, second, first]
+
+            second.mark(5, max_lag=router.max_lag)
+            assert {router.pick() for _ in range(3)} == {first}
+
+            first.mark(None, max_lag=router.max_lag)
+            assert router.pick() is None
+
+            await router.check()
+            router.note_write()
+            assert router.pick() is None
+        finally:
+            for engine in engines:
+                await engine.dispose()
+
+    def test_window_covers_replica_lag(self):
+        with pytest.raises(ValidationError):
+            config.Testing(PG_READ_YOUR_WRITES_SECONDS=5)
+        settings = config.Testing(
+            PG_REPLICA_MAX_LAG_SECONDS=2,
+            PG_READ_YOUR_WRITES_SECONDS=7,
+        )
+        assert settings.PG_READ_YOUR_WRITES_SECONDS == 7
+
+    async def test_least_busy(self):
+        engines = [create_async_engine(pg_uri) for _ in range(2)]
+        router = ReplicaRouter(engines, selection="least_busy", check_interval=60)
+        router.checked = time.monotonic()
+        for replica in router.replicas:
+            replica.mark(0, max_lag=router.max_lag)
+        try:
+            async with engines[0].connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                assert router.pick() is router.replicas[1]
+        finally:
+            for engine in engines:
+                await engine.dispose()
+
+
+class TestSessionReleaseRoute:
+    async def test_session_closed_when_endpoint_returns(self, db_session):
+        async def endpoint(db):
+            await db.execute(text("SELECT 1"))
+            assert db.in_transaction()
+            return {"ok": True}
+
+        route = SessionReleaseRoute("/", endpoint)
+        assert await route.dependant.call(db=db_session) == {"ok": True}
+        assert not db_session.in_transaction()
+
+    async def test_streaming_keeps_session(self, db_session):
+        async def endpoint(db):
+            await db.execute(text("SELECT 1"))
+            return StreamingResponse(iter([b""]))
+
+        route = SessionReleaseRoute("/", endpoint)
+        await route.dependant.call(db=db_session)
+        assert db_session.in_transaction()
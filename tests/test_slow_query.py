@@ -0,0 +1,76 @@
+import asyncio
+import logging
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app import crud
+from app.core.request_context import RequestContextMiddleware, current_route
+from app.core.slow_query import SlowQueryLog, redact
+from app.models import Post
+from tests.conftest import pg_uri
+
+pytestmark = pytest.mark.anyio
+
+
+class TestSlowQueryLog:
+    def test_redact(self):
+        assert redact(("secret@mail.com", 10)) == ["<str>", "<int>"]
+        assert redact({"email": "secret@mail.com"}) == ["<str>"]
+
+    async def test_slow_select_is_logged_with_plan(
+        self,
+        prepare_db: None,
+        caplog: pytest.LogCaptureFixture,
+    ):
+        engine = create_async_engine(pg_uri)
+        log = SlowQueryLog(threshold=0, explain_sample=1)
+        log.instrument(engine)
+
+        caplog.set_level(logging.WARNING, logger="app.core.slow_query")
+        try:
+            async with AsyncSession(engine) as db:
+                stmt = select(Post.id).filter(crud.post.tags_filter(["secret-tag"]))
+                await db.execute(stmt)
+            await asyncio.gather(*log.tasks)
+        finally:
+            await engine.dispose()
+
+        messages = [record.getMessage() for record in caplog.records]
+        slow = next(message for message in messages if message.startswith("Slow"))
+        assert "route=-" in slow and "secret-tag" not in slow
+        plan = next(message for message in messages if message.startswith("Plan"))
+        assert "Execution Time" in plan
+
+    async def test_route_known_without_metrics(
+        self,
+        prepare_db: None,
+        caplog: pytest.LogCaptureFixture,
+    ):
+        engine = create_async_engine(pg_uri)
+        log = SlowQueryLog(threshold=0, explain_sample=0)
+        log.instrument(engine)
+
+        class Route:
+            path = "/post/{post_id}"
+
+        async def app(scope, receive, send):
+            # Router puts matched route into the scope.
+            scope["route"] = Route()
+            async with AsyncSession(engine) as db:
+                await db.execute(select(Post.id))
+
+        caplog.set_level(logging.WARNING, logger="app.core.slow_query")
+        try:
+            await RequestContextMiddleware(app)({"type": "http"}, None, None)
+        finally:
+            await engine.dispose()
+
+        slow = next(
+            record.getMessage()
+            for record in caplog.records
+            if record.getMessage().startswith("Slow")
+        )
+        assert "route=/post/{post_id}" in slow
+        assert current_route() is None
@@ -1,11 +1,16 @@
 import pytest
 from fastapi import status
 from httpx import AsyncClient
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app import schemas
+from app import crud, schemas
 from app.api.endpoints.user import get_user_helper
 from app.core import exceptions
+from app.core.cache import principal_cache
+from app.core.token_epochs import token_epochs
+from app.models import Account
+from app.models.user import token_epoch_seq
 from tests import utils
 
 pytestmark = pytest.mark.anyio
@@ -190,3 +195,97 @@ class TestUser:
         assert requrest.status_code == status.HTTP_200_OK
         token = requrest.json()["access_token"]
         assert token
+
+    async def test_principal_cache(
+        self,
+        client: AsyncClient,
+        admin_auth_header: dict,
+        user_data_expected: utils.Users,
+        create_other_users: None,
+    ) -> None:
+        user = user_data_expected["admin_user"]
+
+        user_manager = utils.ManageUser(client=client)
+        request = await user_manager.login(
+            {"username": user.email, "password": user.password},
+        )
+        token = request.json()["access_token"]
+        user_manager.set_headers({"Authorization": f"Bearer {token}"})
+
+        hits = principal_cache.stats.hits
+        for _ in range(2):
+            request = await user_manager.get("me")
+            assert request.status_code == status.HTTP_200_OK
+        assert principal_cache.stats.hits > hits
+
+        # Claims alone authorize admin endpoints.
+        request = await user_manager.get(user.email)
+        assert request.status_code == status.HTTP_200_OK
+
+        # Disabling bumps token epoch, outstanding token is revoked at once.
+        root_manager = utils.ManageUser(client=client)
+        root_manager.set_headers(admin_auth_header)
+        root_manager.set_body({"disabled": True})
+        request = await root_manager.disable(user.email)
+        assert request.status_code == status.HTTP_200_OK
+
+        for path in ["me", user.email]:
+            request = await user_manager.get(path)
+            assert request.status_code == status.HTTP_401_UNAUTHORIZED
+            assert request.json()["detail"] == exceptions.TokenRevoked.detail
+
+    async def test_token_epoch_refresh(
+        self,
+        prepare_db: None,
+        create_admin: None,
+        db_session: AsyncSession,
+        user_data_expected: utils.Users,
+    ) -> None:
+        admin = user_data_expected["admin"]
+        user = await crud.user.get_user(db_session, email=admin.email)
+        assert user
+
+        epoch = (
+            await db_session.execute(
+                select(Account.token_epoch).filter_by(id=user.id),
+            )
+        ).scalar_one()
+        assert await token_epochs.is_current(
+            db_session,
+            account_id=user.id,
+            epoch=epoch,
+        )
+
+        # Bump made by "another worker": only the incremental refresh sees it.
+        await db_session.execute(
+            update(Account)
+            .filter_by(id=user.id)
+            .values(token_epoch=token_epoch_seq.next_value()),
+        )
+        await db_session.commit()
+        assert await token_epochs.is_current(
+            db_session,
+            account_id=user.id,
+            epoch=epoch,
+        )
+
+        token_epochs.refreshed = float("-inf")
+        assert not await token_epochs.is_current(
+            db_session,
+            account_id=user.id,
+            epoch=epoch,
+        )
+
+        # Epoch committed below the watermark is read for its account alone.
+        current = (
+            await db_session.execute(
+                select(Account.token_epoch).filter_by(id=user.id),
+            )
+        ).scalar_one()
+        token_epochs.discard(user.id)
+        token_epochs.watermark = current + 1000
+        assert await token_epochs.is_current(
+            db_session,
+            account_id=user.id,
+            epoch=current,
+        )
@@ -1,7 +1,12 @@
 from dataclasses import dataclass
 from typing import Literal
+from urllib.parse import urlencode
 
 from httpx import AsyncClient, Response
+from sqlalchemy import bindparam, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
 
 from app import schemas
 
@@ -13,6 +18,17 @@ def map_role_name_to_id(role_name: Literal["admin", "user"]) -> int:
         return 2
 
 
+async def explain(db: AsyncSession, stmt: Select) -> str:
+    compiled = stmt.compile(dialect=postgresql.dialect(paramstyle="named"))
+    params = [
+        bindparam(key, value, type_=compiled.binds[key].type)
+        for key, value in compiled.params.items()
+    ]
+    explain_stmt = text(f"EXPLAIN {compiled}").bindparams(*params)
+    plan = (await db.execute(explain_stmt)).scalars().all()
+    return "\n".join(plan)
+
+
 class User(schemas.CreateUserRequest):
     id: int
     role_name: Literal["admin", "user"]
@@ -84,6 +100,10 @@ class ManagePost(Manage):
         self.set_url(f"/post/{post_id}")
         return await self.request("get")
 
+    async def list(self, **params):
+        self.set_url(f"/post/?{urlencode(params)}")
+        return await self.request("get")
+
     async def update(self, post_id: str, post: schemas.UpdatePostRequest):
         self.set_url(f"/post/{post_id}")
         self.set_body(post.model_dump())